@@ -4,71 +4,716 @@ Adobe Hackathon Task 1A: PDF Outline Extraction
 High-performance CPU-based PDF heading extraction using multiple methods
 """
 
+import argparse
+import concurrent.futures
+import io
 import json
 import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import tempfile
 import time
+from collections.abc import Sequence
 from pathlib import Path
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Callable
 import re
 
 # Core PDF processing libraries
+import numpy as np  # Vectorized per-page line grouping
 import pymupdf  # PyMuPDF for fast outline extraction
 import pdfplumber  # For detailed font analysis
-from collections import Counter, defaultdict
+from pdfminer.fontmetrics import FONT_METRICS  # Standard 14 font metrics used by pdfminer
+from pdfminer.pdfpage import PDFPage, LITERAL_PAGE
+from pdfminer.pdftypes import PDFObjRef, dict_value
+
+from outline_cache import OutlineCache
+from outline_profiler import StageProfile, PROFILERS, external_profiler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Character-level layout engines available to the font-based analysis
+ENGINE_PDFPLUMBER = "pdfplumber"  # pdfminer layout (default)
+ENGINE_PYMUPDF = "pymupdf"        # MuPDF glyph trace (C-backed, much faster)
+LAYOUT_ENGINES = (ENGINE_PDFPLUMBER, ENGINE_PYMUPDF)
+
+# Strategies reported in the result metadata when a deadline is set
+STRATEGY_EMBEDDED = "embedded_outline"  # Bookmarks, no page analysis needed
+STRATEGY_FULL = "full"                  # Every page with the configured engine
+STRATEGY_FAST_ENGINE = "pymupdf_engine" # Every page with the MuPDF glyph engine
+STRATEGY_SAMPLED = "sampled"            # Evenly spaced subset of pages
+STRATEGY_TRUNCATED = "truncated"        # Deadline hit mid-scan, pages so far
+STRATEGY_TITLE_ONLY = "title_only"      # No time for page analysis at all
+EXACT_STRATEGIES = (STRATEGY_EMBEDDED, STRATEGY_FULL)
+
+
+class LineRecord:
+    """
+    Compact summary of one text line, kept instead of its character dicts
+    """
+
+    __slots__ = ('text', 'font_size', 'avg_font_size', 'top', 'is_bold')
+
+    def __init__(self, text: str, font_size: Optional[float], avg_font_size: float, top: float, is_bold: bool):
+        self.text = text                    # Characters joined in reading order (unstripped)
+        self.font_size = font_size          # Dominant rounded font size, None if all sizes are zero
+        self.avg_font_size = avg_font_size  # Mean raw character size
+        self.top = top                      # Smallest character top on the line
+        self.is_bold = is_bold              # Any character set in a bold font
+
+    def __repr__(self) -> str:
+        return f"LineRecord({self.text!r}, font_size={self.font_size}, top={self.top:.1f})"
+
+
+class FontSizeStats:
+    """
+    Fixed-size running statistics for one rounded font size
+    """
+
+    __slots__ = ('count', 'is_bold', 'sample_parts', 'sample_length', 'min_top', 'max_top', 'sum_top')
+
+    def __init__(self):
+        self.count = 0
+        self.is_bold = False
+        self.sample_parts = []  # First character texts, bounded by FontHistogram.SAMPLE_LENGTH
+        self.sample_length = 0
+        self.min_top = float('inf')
+        self.max_top = float('-inf')
+        self.sum_top = 0.0
+
+    @property
+    def sample_text(self) -> str:
+        return ''.join(self.sample_parts)
+
+
+class FontHistogram:
+    """
+    Streaming font-size histogram whose memory does not grow with page count
+    """
+
+    SAMPLE_LENGTH = 50  # Characters of sample text kept per font size
+
+    def __init__(self):
+        self.sizes: Dict[float, FontSizeStats] = {}  # Insertion order = first use in the document
+        self.total_chars = 0
+
+    def add_chars(self, chars) -> None:
+        """Accumulate a page's characters in content-stream order"""
+        sizes = self.sizes
+        sample_length = self.SAMPLE_LENGTH
+
+        for char in chars:
+            font_size = round(char['size'], 1)
+            stats = sizes.get(font_size)
+            if stats is None:
+                stats = sizes[font_size] = FontSizeStats()
+
+            stats.count += 1
+            if not stats.is_bold and 'bold' in char.get('fontname', '').lower():
+                stats.is_bold = True
+
+            text = char['text']
+            if stats.sample_length < sample_length and text:
+                stats.sample_parts.append(text)
+                stats.sample_length += len(text)
+
+            top = char['top']
+            if top < stats.min_top:
+                stats.min_top = top
+            if top > stats.max_top:
+                stats.max_top = top
+            stats.sum_top += top
+
+        self.total_chars += len(chars)
+
+    def merge(self, other: "FontHistogram") -> None:
+        """
+        Fold in the histogram of the pages that follow this one; the result is
+        the same as accumulating both page ranges in order
+        """
+        sample_length = self.SAMPLE_LENGTH
+
+        for font_size, theirs in other.sizes.items():
+            stats = self.sizes.get(font_size)
+            if stats is None:
+                stats = self.sizes[font_size] = FontSizeStats()
+
+            stats.count += theirs.count
+            stats.is_bold = stats.is_bold or theirs.is_bold
+
+            # Replay their sample pieces through the same length cap
+            for text in theirs.sample_parts:
+                if stats.sample_length >= sample_length:
+                    break
+                stats.sample_parts.append(text)
+                stats.sample_length += len(text)
+
+            stats.min_top = min(stats.min_top, theirs.min_top)
+            stats.max_top = max(stats.max_top, theirs.max_top)
+            stats.sum_top += theirs.sum_top
+
+        self.total_chars += other.total_chars
+
+    def to_font_stats(self) -> Dict[float, Dict]:
+        """
+        Summaries in the shape expected by ``_identify_heading_fonts``
+        """
+        font_stats = {}
+
+        for font_size, stats in self.sizes.items():
+            font_stats[font_size] = {
+                'count': stats.count,
+                'avg_chars_per_line': 0,
+                'is_bold': stats.is_bold,
+                'sample_text': stats.sample_text,
+                'min_top': stats.min_top,
+                'max_top': stats.max_top,
+                'mean_top': stats.sum_top / stats.count,
+                'frequency': stats.count / self.total_chars if self.total_chars > 0 else 0
+            }
+
+        return font_stats
+
+
+class _GlyphDevice(pymupdf.mupdf.FzDevice2):
+    """
+    MuPDF device recording every shown glyph in content-stream order. Unlike
+    MuPDF's structured text (``rawdict``), it keeps overprinted "fake bold"
+    copies and the drawing order, as pdfminer does.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.use_virtual_fill_text()
+        self.use_virtual_stroke_text()
+        self.use_virtual_ignore_text()  # Invisible text (render mode 3)
+        self.spans = []  # (font, text matrix, wmode, [(ucs, gid, x, y), ...]) in device space
+        self._last_fill = None
+
+    def _collect(self, text, ctm) -> List[Tuple]:
+        ctm = pymupdf.mupdf.FzMatrix(ctm)
+        ca, cb, cc, cd, ce, cf = ctm.a, ctm.b, ctm.c, ctm.d, ctm.e, ctm.f
+        spans = []
+        raw_span = text.head
+        while raw_span:
+            span = pymupdf.mupdf.FzTextSpan(raw_span)
+            glyphs = []
+            for i in range(raw_span.len):
+                item = span.items(i)
+                x, y = item.x, item.y
+                glyphs.append((item.ucs, item.gid, x * ca + y * cc + ce, x * cb + y * cd + cf))
+            trm = pymupdf.mupdf.fz_concat(span.trm(), ctm)
+            spans.append((span.font(), (trm.a, trm.b, trm.c, trm.d), raw_span.wmode, glyphs))
+            raw_span = raw_span.next
+        return spans
+
+    def fill_text(self, ctx, text, ctm, *args):
+        self._last_fill = self._collect(text, ctm)
+        self.spans.extend(self._last_fill)
+
+    def stroke_text(self, ctx, text, stroke, ctm, *args):
+        spans = self._collect(text, ctm)
+        # Fill-and-stroke text (render mode 2) arrives twice; pdfminer reports it once
+        if self._last_fill is None or [span[1:] for span in spans] != [span[1:] for span in self._last_fill]:
+            self.spans.extend(spans)
+        self._last_fill = None
+
+    def ignore_text(self, ctx, text, ctm):
+        self._last_fill = None
+        self.spans.extend(self._collect(text, ctm))
+
+
+class PyMuPDFPage:
+    """
+    Adapter exposing a PyMuPDF page through the subset of the pdfplumber page
+    interface used by the heading heuristics (``chars`` and ``height``)
+    """
+
+    SIZE_PRECISION = 4  # Decimal places kept of character sizes
+
+    def __init__(self, page, fonts: Optional[Dict[int, Tuple[str, Optional[float]]]] = None):
+        self._page = page
+        self._chars = None
+        self._fonts = fonts if fonts is not None else {}
+        self.height = page.rect.height
+
+    @property
+    def chars(self) -> List[Dict]:
+        """Characters as pdfplumber-style dicts, built once from the page's glyphs"""
+        if self._chars is None:
+            self._chars = self._extract_chars()
+        return self._chars
+
+    def flush_cache(self) -> None:
+        """Drop the character dicts (mirrors ``pdfplumber.Page.flush_cache``)"""
+        self._chars = None
+
+    def _extract_chars(self) -> List[Dict]:
+        chars = []
+        fonts = self._page_fonts()
+        device = _GlyphDevice()
+        pymupdf.mupdf.fz_run_page(self._page.this, device, pymupdf.mupdf.FzMatrix(), pymupdf.mupdf.FzCookie())
+        pymupdf.mupdf.fz_close_device(device)
+
+        advances = {}
+        for font, (a, b, c, d), wmode, glyphs in device.spans:
+            font_key = font.m_internal_value()
+            fontname, descent = fonts.get(font_key, (None, None))
+            if fontname is None:
+                fontname = pymupdf.mupdf.fz_font_name(font)
+            if descent is None:
+                descent = pymupdf.mupdf.fz_font_descender(font)
+            previous = None
+
+            for ucs, gid, x, y in glyphs:
+                # Multi-character glyphs (e.g. "Th" ligatures) continue with
+                # glyph-less items; pdfminer reports one char
+                if gid < 0 and previous is not None:
+                    previous["text"] += chr(ucs)
+                    continue
+
+                adv = advances.get((font_key, gid, wmode))
+                if adv is None:
+                    adv = pymupdf.mupdf.fz_advance_glyph(font, gid, wmode) if gid >= 0 else 0.0
+                    advances[font_key, gid, wmode] = adv
+
+                # pdfminer's glyph box: one advance wide and one em high from
+                # the font descent, mapped through the text matrix
+                xs = [x + u * a + v * c for u in (0.0, adv) for v in (descent, descent + 1)]
+                ys = [y + u * b + v * d for u in (0.0, adv) for v in (descent, descent + 1)]
+                x0, x1, top, bottom = min(xs), max(xs), min(ys), max(ys)
+                previous = {
+                    "text": chr(ucs) if ucs >= 0 else "",
+                    # MuPDF works in single precision; snap the size back to the
+                    # value in the content stream so 20pt text is not 19.99999
+                    "size": round((x1 - x0) if wmode else (bottom - top), self.SIZE_PRECISION),
+                    "fontname": fontname,
+                    "x0": x0,
+                    "x1": x1,
+                    "top": top,
+                }
+                chars.append(previous)
+
+        return chars
+
+    def _page_fonts(self) -> Dict[int, Tuple[str, Optional[float]]]:
+        """
+        Map the MuPDF fonts used on the page to the font name and descent
+        pdfminer would report, read from the PDF font dictionaries (AFM
+        metrics for the standard 14 fonts and their aliases)
+        """
+        doc = self._page.parent
+        mupdf = pymupdf.mupdf
+        page = mupdf.ll_pdf_page_from_fz_page(self._page.this.m_internal)  # Borrowed
+        if page is None:
+            return {}
+        resources = mupdf.ll_pdf_page_resources(page)
+
+        fonts = {}
+        for xref, _, font_type, basefont, *_ in self._page.get_fonts():
+            if xref not in self._fonts:
+                self._fonts[xref] = self._resolve_font(doc, xref, font_type, basefont)
+            # Loaded fonts are cached per font object, so this yields the same
+            # fz_font the page draws with, even when two fonts share a name
+            font_ref = mupdf.ll_pdf_new_indirect(page.doc, xref, 0)
+            try:
+                desc = mupdf.ll_pdf_load_font(page.doc, resources, font_ref)
+            except Exception:
+                continue
+            finally:
+                mupdf.ll_pdf_drop_obj(font_ref)
+            fonts[mupdf.FzFont(mupdf.ll_fz_keep_font(desc.font)).m_internal_value()] = self._fonts[xref]
+            mupdf.ll_pdf_drop_font(desc)
+
+        return fonts
+
+    @staticmethod
+    def _resolve_font(doc, xref: int, font_type: str, basefont: str) -> Tuple[Optional[str], Optional[float]]:
+        """pdfminer's (fontname, descent) for a font; None where MuPDF's value should be kept"""
+        try:
+            if font_type in ("Type1", "TrueType", "MMType1") and basefont in FONT_METRICS:
+                metrics = FONT_METRICS[basefont][0]
+                return metrics.get("FontName", basefont), -abs(metrics.get("Descent", 0)) * 0.001
+
+            descriptor_owner = xref
+            if font_type == "Type0":
+                kind, value = doc.xref_get_key(xref, "DescendantFonts")
+                if kind == "xref":
+                    value = doc.xref_object(int(value.split()[0]))
+                match = re.search(r'(\d+) 0 R', value)
+                if not match:
+                    return None, None
+                descriptor_owner = int(match.group(1))
+
+            kind, value = doc.xref_get_key(descriptor_owner, "FontDescriptor/FontName")
+            fontname = re.sub(r'#([0-9A-Fa-f]{2})', lambda m: chr(int(m.group(1), 16)), value[1:]) \
+                if kind == "name" else "unknown"
+            if font_type == "Type3":
+                return fontname, None  # Descent comes from the glyph matrix; keep MuPDF's value
+
+            kind, value = doc.xref_get_key(descriptor_owner, "FontDescriptor/Descent")
+            descent = float(value) if kind in ("int", "real") else 0
+        except Exception:
+            return None, None
+
+        # pdfminer forces descents negative and scales them to text space
+        return fontname, -abs(descent) * 0.001
+
+
+class ExtractionError(Exception):
+    """
+    A document that could not be fully processed. ``result`` holds what was
+    recovered, which is served as usual but never cached.
+    """
+
+    def __init__(self, message: str, result: Dict[str, Any]):
+        super().__init__(message)
+        self.result = result
+
+    def __reduce__(self):
+        # Crosses process boundaries with its partial result
+        return ExtractionError, (str(self), self.result)
+
+
+class LazyPages(Sequence):
+    """
+    Layout pages of a document, each built on first access, so previews of
+    a few pages do not pay for every page of a long document
+    """
+
+    def __init__(self, count: int, load: Callable[[int], Any]):
+        self._count = count
+        self._load = load
+        self._loaded = {}  # Page index -> layout page
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(f"page index {index} out of range")
+        if index not in self._loaded:
+            self._loaded[index] = self._load(index)
+        return self._loaded[index]
+
+    def loaded(self) -> List[Any]:
+        """Pages built so far"""
+        return list(self._loaded.values())
+
+
+def _pdfminer_page(document, xref: int) -> PDFPage:
+    """
+    pdfminer page for page object ``xref``, with the attributes inherited
+    from its ancestors merged in as PDFPage.create_pages does, but without
+    parsing the rest of the page tree
+    """
+    attrs = dict_value(document.getobj(xref)).copy()
+    if attrs.get("Type", attrs.get("type")) is not LITERAL_PAGE:
+        raise ValueError(f"object {xref} is not a page")
+
+    # Nearest ancestor first; create_pages also lets the catalog pass attributes down
+    ancestors = []
+    parent, seen = attrs.get("Parent"), {xref}
+    while parent is not None and not (isinstance(parent, PDFObjRef) and parent.objid in seen):
+        if isinstance(parent, PDFObjRef):
+            seen.add(parent.objid)
+        node = dict_value(parent)
+        ancestors.append(node)
+        parent = node.get("Parent")
+    ancestors.append(document.catalog)
+
+    for node in ancestors:
+        for key in PDFPage.INHERITABLE_ATTRS:
+            if key not in attrs and key in node:
+                attrs[key] = node[key]
+    return PDFPage(document, xref, attrs, None)
+
+
+class PDFDocumentSession:
+    """
+    Opens a PDF once and shares the parsed document, its metadata and the
+    first-page layout with every extraction method
+    """
+
+    def __init__(self, pdf_path: str, engine: str = ENGINE_PDFPLUMBER, profile: Optional[StageProfile] = None):
+        self.pdf_path = pdf_path
+        self.engine = engine
+        self.profile = profile if profile is not None else StageProfile()  # Per-stage timings
+        self._data = None
+        self._doc = None
+        self._plumber = None
+        self._metadata = None
+        self._pages = {}  # Engine -> layout pages
+        self._fonts = {}  # Font xref -> pdfminer (fontname, descent), shared by all pages
+        self.first_page_lines = None  # Line records of page 1, shared by title analysis
+        self.first_page_title = None  # Memoized first-page title analysis
+        self.deadline_at = None  # time.monotonic() by which extraction should finish
+        self.strategy = None  # How the outline was produced (see STRATEGY_*)
+        self.pages_analyzed = 0
+        self.errors = []  # Failures the extraction methods recovered from
+
+    def __enter__(self) -> "PDFDocumentSession":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @property
+    def data(self) -> bytes:
+        """Raw PDF bytes, read from disk only once"""
+        if self._data is None:
+            with self.profile.stage("open"), open(self.pdf_path, 'rb') as f:
+                self._data = f.read()
+            self.profile.count("open", bytes=len(self._data))
+        return self._data
+
+    @property
+    def doc(self):
+        """PyMuPDF document (xref table parsed once)"""
+        if self._doc is None:
+            data = self.data
+            with self.profile.stage("open"):
+                self._doc = pymupdf.open(stream=data, filetype="pdf")
+        return self._doc
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Document metadata read once from the PyMuPDF document"""
+        if self._metadata is None:
+            self._metadata = self.doc.metadata or {}
+        return self._metadata
+
+    @property
+    def plumber(self):
+        """pdfplumber document opened lazily over the same bytes"""
+        if self._plumber is None:
+            data = self.data
+            with self.profile.stage("open"):
+                self._plumber = pdfplumber.open(io.BytesIO(data))
+        return self._plumber
+
+    @property
+    def pages(self) -> List[Any]:
+        """Layout pages for the selected engine (pdfplumber pages or PyMuPDF adapters)"""
+        return self.pages_for(self.engine)
+
+    def pages_for(self, engine: str) -> Sequence:
+        """Layout pages for ``engine``, each built once per session when first used"""
+        if engine not in self._pages:
+            load = self._pymupdf_page if engine == ENGINE_PYMUPDF else self._plumber_page
+            self._pages[engine] = LazyPages(self.doc.page_count, load)
+        return self._pages[engine]
+
+    def _pymupdf_page(self, index: int) -> "PyMuPDFPage":
+        return PyMuPDFPage(self.doc[index], self._fonts)
+
+    def _plumber_page(self, index: int):
+        """
+        pdfplumber page ``index``, built straight from its page object.
+        ``plumber.pages`` would parse every page object of the document first,
+        and is only the fallback when the page tree cannot be followed.
+        """
+        try:
+            page = _pdfminer_page(self.plumber.doc, self.doc.page_xref(index))
+            # Character "doctop" values are relative to this page (unused here)
+            return pdfplumber.page.Page(self.plumber, page, page_number=index + 1)
+        except Exception as e:
+            logger.debug(f"Loading every page to reach page {index + 1}: {str(e)}")
+            return self.plumber.pages[index]
+
+    @property
+    def first_page(self):
+        """First layout page; its characters are cached after first use"""
+        pages = self.pages
+        return pages[0] if pages else None
+
+    def close(self) -> None:
+        """Release both parsed documents and the raw bytes"""
+        if self._plumber is not None:
+            # pdfplumber's close() would first build every page; close the ones in use
+            if ENGINE_PDFPLUMBER in self._pages:
+                for page in self._pages[ENGINE_PDFPLUMBER].loaded():
+                    page.close()
+            self._plumber.flush_cache()
+            self._plumber.stream.close()
+            self._plumber = None
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+        self._data = None
+
+
 class PDFOutlineExtractor:
     """
     Multi-method PDF outline extractor optimized for speed and accuracy
     """
 
-    def __init__(self):
+    # Bump whenever the heuristics change so cached results are invalidated
+    VERSION = "1.2"
+
+    # --- DATASET-DRIVEN FONT SIZE TO HEADING LEVEL MAPPING ---
+    # This mapping should be updated/tuned as new sample PDFs are added.
+    # Key: font size (rounded to 1 decimal), Value: heading level ("H1", "H2", ...)
+    DATASET_FONT_HEADING_MAP = {
+        24.0: "H1",  # e.g., "Overview" title
+        20.0: "H1",  # e.g., major section
+        18.0: "H1",  # e.g., "3. Syllabus"
+        16.0: "H2",  # e.g., "3.1 Intended Audience"
+        14.0: "H2",  # e.g., subsection
+        12.0: "H3",  # e.g., minor heading
+    }
+
+    # Share of the remaining time budget a projected scan may use; the rest
+    # covers classification, title analysis and estimation error
+    DEADLINE_SAFETY = 0.8
+
+    def __init__(self, engine: str = ENGINE_PDFPLUMBER, page_workers: int = 1, parallel_min_pages: int = 200,
+                 profile_report: bool = False, profiler: Optional[str] = None,
+                 deadline: Optional[float] = None, deadline_probe_pages: int = 2, heading_sample_pages: int = 10):
+        if engine not in LAYOUT_ENGINES:
+            raise ValueError(f"Unknown layout engine '{engine}', expected one of {LAYOUT_ENGINES}")
+        if profiler is not None and profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}', expected one of {PROFILERS}")
+
+        self.engine = engine            # Character source for font-based analysis
+        self.page_workers = page_workers              # Processes for page-parallel font analysis
+        self.parallel_min_pages = parallel_min_pages  # Smallest document worth splitting
+        self.profile_report = profile_report          # Write per-stage timings next to each result
+        self.profiler = profiler                      # Optional cProfile/pyinstrument hook
+        self.deadline = deadline                      # Seconds per document before degrading (None = off)
+        self.deadline_probe_pages = deadline_probe_pages  # Pages timed to project the full cost
+        self.heading_sample_pages = heading_sample_pages  # Pages sampled for font statistics with max_headings
         self.font_size_threshold = 2.0  # Minimum font size difference for heading detection
         self.min_heading_chars = 3      # Minimum characters for a valid heading
         self.max_heading_chars = 200    # Maximum characters for a valid heading
 
-    def extract_outline(self, pdf_path: str) -> Dict[str, Any]:
+    def cache_fingerprint(self) -> str:
         """
-        Extract document outline using multiple methods
+        Everything besides the PDF bytes that can change the output, used to
+        key the result cache (parallelism and profiling settings do not affect results)
         """
+        return json.dumps({
+            "version": self.VERSION,
+            "engine": self.engine,
+            "font_size_threshold": self.font_size_threshold,
+            "min_heading_chars": self.min_heading_chars,
+            "max_heading_chars": self.max_heading_chars,
+            "heading_map": sorted(self.DATASET_FONT_HEADING_MAP.items()),
+            "deadline": self.deadline  # Adds the metadata key to results
+        }, sort_keys=True)
+
+    def extract_outline(self, pdf_path: str, profile: Optional[StageProfile] = None,
+                        page_range: Optional[Tuple[int, int]] = None, max_headings: Optional[int] = None,
+                        title_only: bool = False, raise_errors: bool = False) -> Dict[str, Any]:
+        """
+        Extract document outline using multiple methods. Pass a StageProfile
+        to collect per-stage timings for the document.
+
+        Failures degrade to an empty or partial result. With ``raise_errors``
+        they raise ExtractionError carrying that result instead, so callers
+        can tell it from a clean extraction (the result cache stores only
+        those).
+
+        For previews, ``page_range`` (first, last; 1-based, inclusive) limits
+        the outline to those pages and the font analysis reads no others,
+        ``max_headings`` stops once that many headings are found, and
+        ``title_only`` skips the outline entirely.
+
+        With a deadline, the font-based analysis degrades to cheaper
+        strategies when it is projected to overrun, and the result gets a
+        "metadata" entry recording the strategy used.
+        """
+        if max_headings is not None and max_headings < 0:
+            raise ValueError(f"max_headings must be non-negative, got {max_headings}")
+        if page_range is not None and (len(page_range) != 2 or page_range[0] > page_range[1]):
+            raise ValueError(f"page_range must be (first, last) with first <= last, got {page_range}")
+
         logger.info(f"Processing PDF: {pdf_path}")
         start_time = time.time()
 
         try:
-            # Method 1: Try PyMuPDF outline extraction (fastest)
-            outline_data = self._extract_pymupdf_outline(pdf_path)
-
-            # Method 2: If no outline found, use font-based analysis
-            if not outline_data["outline"]:
-                logger.info("No embedded outline found, using font-based analysis")
-                outline_data = self._extract_font_based_outline(pdf_path)
-
-            # Method 3: Extract title if not found
-            if not outline_data["title"]:
-                outline_data["title"] = self._extract_title(pdf_path)
+            # Open the document once and share it between all methods
+            with PDFDocumentSession(pdf_path, engine=self.engine, profile=profile) as session:
+                if self.deadline is not None:
+                    session.deadline_at = time.monotonic() + self.deadline
+
+                if title_only:
+                    # Same title a full run would give: metadata when bookmarked, else page 1
+                    outline_data = self._extract_pymupdf_outline(session)
+                    if not outline_data["outline"] and session.pages:
+                        with session.profile.stage("title"):
+                            outline_data["title"] = self._extract_session_page_title(session)
+                    outline_data["outline"] = []
+                    session.strategy = STRATEGY_TITLE_ONLY
+                else:
+                    indices = None
+                    if page_range is not None:
+                        first, last = max(1, page_range[0]), min(session.doc.page_count, page_range[1])
+                        indices = list(range(first - 1, last))
+
+                    # Method 1: Try PyMuPDF outline extraction (fastest)
+                    outline_data = self._extract_pymupdf_outline(session)
+                    if outline_data["outline"]:
+                        session.strategy = STRATEGY_EMBEDDED
+
+                        # Bookmarks are authoritative: keep those in range, even if none are
+                        if page_range is not None:
+                            outline_data["outline"] = [item for item in outline_data["outline"]
+                                                       if page_range[0] <= item["page"] <= page_range[1]]
+
+                    # Method 2: If no outline found, use font-based analysis
+                    if not outline_data["outline"] and session.strategy is None:
+                        logger.info("No embedded outline found, using font-based analysis")
+                        outline_data = self._extract_font_based_outline(session, indices, max_headings)
+
+                    if max_headings is not None:
+                        outline_data["outline"] = outline_data["outline"][:max_headings]
+
+                # Method 3: Extract title if not found
+                if not outline_data["title"]:
+                    with session.profile.stage("title"):
+                        outline_data["title"] = self._extract_title(session)
+
+                if self.deadline is not None:
+                    outline_data["metadata"] = {
+                        "strategy": session.strategy,
+                        "pages_analyzed": session.pages_analyzed,
+                        "page_count": session.doc.page_count,
+                        "deadline_seconds": self.deadline
+                    }
 
             processing_time = time.time() - start_time
+            session.profile.total_seconds = processing_time
             logger.info(f"Processing completed in {processing_time:.2f} seconds")
 
-            return outline_data
-
         except Exception as e:
             logger.error(f"Error processing PDF {pdf_path}: {str(e)}")
+            if raise_errors:
+                raise ExtractionError(str(e), {"title": "", "outline": []}) from e
             return {"title": "", "outline": []}
 
-    def _extract_pymupdf_outline(self, pdf_path: str) -> Dict[str, Any]:
+        if raise_errors and session.errors:
+            raise ExtractionError("; ".join(session.errors), outline_data)
+        return outline_data
+
+    def _extract_pymupdf_outline(self, session: PDFDocumentSession) -> Dict[str, Any]:
         """
         Extract outline using PyMuPDF (fastest method for PDFs with bookmarks)
         """
         try:
-            doc = pymupdf.open(pdf_path)
-            title = doc.metadata.get('title', '') or ''
+            doc = session.doc
+            title = session.metadata.get('title', '') or ''
 
             # Get table of contents
-            toc = doc.get_toc()  # Returns [[level, title, page], ...]
+            with session.profile.stage("toc"):
+                toc = doc.get_toc()  # Returns [[level, title, page], ...]
+            session.profile.count("toc", entries=len(toc))
             outline = []
 
             for level, heading_title, page in toc:
@@ -83,7 +728,6 @@ class PDFOutlineExtractor:
                             "page": page
                         })
 
-            doc.close()
             logger.info(f"PyMuPDF found {len(outline)} outline items")
 
             return {
@@ -93,43 +737,62 @@ class PDFOutlineExtractor:
 
         except Exception as e:
             logger.warning(f"PyMuPDF extraction failed: {str(e)}")
+            session.errors.append(f"outline: {str(e)}")
             return {"title": "", "outline": []}
 
-    def _extract_font_based_outline(self, pdf_path: str) -> Dict[str, Any]:
+    def _extract_font_based_outline(self, session: PDFDocumentSession, indices: Optional[List[int]] = None,
+                                    max_headings: Optional[int] = None) -> Dict[str, Any]:
         """
-        Extract outline using font-based analysis with pdfplumber
+        Extract outline using font-based analysis with the configured layout engine.
+
+        ``indices`` restricts the analysis to those 0-based pages. With
+        ``max_headings`` the font statistics come from a bounded sample and
+        pages are read in order only until that many headings are found.
         """
         try:
             outline = []
             title = ""
+            pages = session.pages
+            profile = session.profile
 
-            with pdfplumber.open(pdf_path) as pdf:
-                # Collect font information across all pages
-                font_stats = self._analyze_font_statistics(pdf)
-                heading_fonts = self._identify_heading_fonts(font_stats)
+            if max_headings is None:
+                # Read every page once: font statistics plus a compact line cache
+                font_stats, page_numbers, page_lines = self._analyze_font_statistics(session, indices)
 
-                logger.info(f"Identified {len(heading_fonts)} heading font sizes: {list(heading_fonts.keys())}")
+                with profile.stage("classification"):
+                    heading_fonts = self._identify_heading_fonts(font_stats)
 
-                for page_num, page in enumerate(pdf.pages, 1):
-                    page_headings = self._extract_page_headings(page, heading_fonts, page_num)
-                    outline.extend(page_headings)
+                    logger.info(f"Identified {len(heading_fonts)} heading font sizes: {list(heading_fonts.keys())}")
 
-                # Extract title from first page if not found
-                if not title and pdf.pages:
-                    title = self._extract_title_from_page(pdf.pages[0])
+                    for page_num, lines in zip(page_numbers, page_lines):
+                        page_headings = self._extract_page_headings(lines, heading_fonts, page_num)
+                        outline.extend(page_headings)
+                profile.count("classification", lines=sum(len(lines) for lines in page_lines), headings=len(outline))
 
-            # Sort outline by page and position
-            outline.sort(key=lambda x: (x["page"], x.get("y_position", 0)))
-            
-            # Remove y_position from final output (used only for sorting)
-            for item in outline:
-                if "y_position" in item:
-                    del item["y_position"]
-                if "font_size" in item:
-                    del item["font_size"]
-            
-            # Merge split headings (like "3. Overview..." and "Syllabus" on separate lines)
-            outline = self._merge_split_headings(outline)
+                if page_numbers[:1] == [1]:
+                    session.first_page_lines = page_lines[0]
+            else:
+                outline = self._extract_first_headings(session, indices, max_headings)
+
+            # Extract title from first page if not found
+            if not title and pages:
+                with profile.stage("title"):
+                    title = self._extract_session_page_title(session)
+
+            with profile.stage("merge"):
+                # Sort outline by page and position
+                outline.sort(key=lambda x: (x["page"], x.get("y_position", 0)))
+
+                # Remove y_position from final output (used only for sorting)
+                for item in outline:
+                    if "y_position" in item:
+                        del item["y_position"]
+                    if "font_size" in item:
+                        del item["font_size"]
+
+                # Merge split headings (like "3. Overview..." and "Syllabus" on separate lines)
+                outline = self._merge_split_headings(outline)
+            profile.count("merge", headings=len(outline))
 
             logger.info(f"Font-based analysis found {len(outline)} headings")
 
@@ -140,41 +803,379 @@ class PDFOutlineExtractor:
 
         except Exception as e:
             logger.error(f"Font-based extraction failed: {str(e)}")
+            session.errors.append(f"font analysis: {str(e)}")
             return {"title": "", "outline": []}
 
-    def _analyze_font_statistics(self, pdf) -> Dict[float, Dict]:
+    def _extract_first_headings(self, session: PDFDocumentSession, indices: Optional[List[int]],
+                                max_headings: int) -> List[Dict]:
+        """
+        Identify heading fonts from a bounded sample of pages, then classify
+        pages in order until ``max_headings`` headings (after merging) are
+        found. Merges never cross pages, so the headings equal the first ones
+        a full pass with the same heading fonts would return.
         """
-        Analyze font usage statistics across the document
+        pages = session.pages
+        profile = session.profile
+        if indices is None:
+            indices = list(range(len(pages)))
+
+        # Half the sample is the leading pages, which the walk reads first anyway;
+        # the rest is spread over the remainder so later styles are seen too
+        sample_count = min(len(indices), max(1, self.heading_sample_pages))
+        head_count = (sample_count + 1) // 2
+        tail, spread = indices[head_count:], sample_count - head_count
+        sample = indices[:head_count] + [tail[len(tail) * i // spread] for i in range(spread)]
+        font_stats, sample_numbers, sample_lines = self._analyze_font_statistics(session, sample)
+        sampled_lines = dict(zip(sample_numbers, sample_lines))
+        if 1 in sampled_lines:
+            session.first_page_lines = sampled_lines[1]
+
+        with profile.stage("classification"):
+            heading_fonts = self._identify_heading_fonts(font_stats)
+        logger.info(f"Identified {len(heading_fonts)} heading font sizes: {list(heading_fonts.keys())}")
+
+        outline = []
+        pages_read = set(sampled_lines)
+        for index in indices:
+            if max_headings <= 0:
+                break
+            page_num = index + 1
+            lines = sampled_lines.get(page_num)
+            if lines is None:
+                _, scanned = self._scan_pages([pages[index]], profile, session.deadline_at)
+                if not scanned:
+                    logger.warning(f"Deadline reached after {len(pages_read)} pages")
+                    session.strategy = STRATEGY_TRUNCATED
+                    break
+                lines = scanned[0]
+                pages_read.add(page_num)
+
+            with profile.stage("classification"):
+                page_headings = self._extract_page_headings(lines, heading_fonts, page_num)
+                page_headings.sort(key=lambda x: x["y_position"])
+                outline.extend(page_headings)
+            profile.count("classification", lines=len(lines), headings=len(page_headings))
+
+            if len(outline) >= max_headings and len(self._merge_split_headings(outline)) >= max_headings:
+                break
+
+        session.pages_analyzed = len(pages_read)
+        return outline
+
+    def _analyze_font_statistics(self, session: PDFDocumentSession,
+                                 indices: Optional[List[int]] = None) -> Tuple[Dict[float, Dict], List[int], List[List[LineRecord]]]:
         """
-        font_stats = defaultdict(lambda: {
-            'count': 0, 
-            'avg_chars_per_line': 0, 
-            'is_bold': False, 
-            'sample_text': '',
-            'y_positions': []
-        })
+        Analyze font usage statistics across the document (or the 0-based
+        page ``indices``) and cache each page's lines, reading every page's
+        characters exactly once. Returns the font statistics plus the numbers
+        and lines of the pages analyzed.
+        """
+        if indices is None:
+            indices = list(range(len(session.pages)))
+        profile = session.profile
+
+        if session.deadline_at is not None:
+            histogram, page_numbers, page_lines = self._scan_within_deadline(session, indices)
+        else:
+            histogram, page_lines = self._scan_indices(session, indices)
+            page_numbers = [index + 1 for index in indices]
+            session.strategy = STRATEGY_FULL
+
+        session.pages_analyzed = len(page_numbers)
+
+        # Relative frequencies are derived from the running counts
+        with profile.stage("font_statistics"):
+            font_stats = histogram.to_font_stats()
+        return font_stats, page_numbers, page_lines
+
+    def _scan_indices(self, session: PDFDocumentSession, indices: List[int],
+                      deadline_at: Optional[float] = None) -> Tuple[FontHistogram, List[List[LineRecord]]]:
+        """
+        Scan the 0-based pages ``indices`` (ascending); contiguous runs long
+        enough are split across processes when page workers are configured
+        """
+        contiguous = bool(indices) and indices[-1] - indices[0] + 1 == len(indices)
+        if contiguous and self.page_workers > 1 and len(indices) >= self.parallel_min_pages:
+            try:
+                return self._scan_pages_parallel(session.pdf_path, indices[0], indices[-1] + 1, session.profile,
+                                                 deadline_at)
+            except Exception as e:
+                logger.warning(f"Page-parallel analysis failed, falling back to serial: {str(e)}")
+        pages = session.pages
+        return self._scan_pages([pages[index] for index in indices], session.profile, deadline_at)
+
+    def _scan_within_deadline(self, session: PDFDocumentSession,
+                              indices: List[int]) -> Tuple[FontHistogram, List[int], List[List[LineRecord]]]:
+        """
+        Time the first pages, project the cost of the rest and pick the most
+        complete strategy expected to finish before the deadline: every page,
+        every page with the MuPDF glyph engine, an evenly spaced sample, or
+        none (title only). Scans stop early if the deadline passes anyway.
+        """
+        profile = session.profile
+        pages = session.pages
+        probe_count = min(max(1, self.deadline_probe_pages), len(indices))
+        probe, rest = indices[:probe_count], indices[probe_count:]
+
+        def budget() -> float:
+            return (session.deadline_at - time.monotonic()) * self.DEADLINE_SAFETY
+
+        probe_start = time.monotonic()
+        histogram, page_lines = self._scan_pages([pages[index] for index in probe], profile, session.deadline_at)
+        page_cost = (time.monotonic() - probe_start) / max(len(page_lines), 1)
+        page_numbers = [index + 1 for index in probe[:len(page_lines)]]
+        if page_numbers[:1] == [1]:
+            session.first_page_lines = page_lines[0]
+
+        if len(page_lines) < probe_count:
+            session.strategy = STRATEGY_TRUNCATED
+            return histogram, page_numbers, page_lines
+
+        # Page-parallel workers share the remaining pages
+        parallel = self.page_workers if self.page_workers > 1 and len(rest) >= self.parallel_min_pages else 1
+        if page_cost * len(rest) / parallel <= budget():
+            session.strategy = STRATEGY_FULL
+            rest_histogram, rest_lines = self._scan_indices(session, rest, session.deadline_at)
+            return self._extend_scan(session, histogram, page_numbers, page_lines,
+                                     rest_histogram, [index + 1 for index in rest], rest_lines)
+
+        logger.info(f"Projected {page_cost * len(rest):.1f}s for {len(rest)} more pages exceeds the deadline")
+
+        # The MuPDF glyph engine is typically several times cheaper per page
+        if self.engine != ENGINE_PYMUPDF and indices:
+            fast_pages = session.pages_for(ENGINE_PYMUPDF)
+            fast_start = time.monotonic()
+            fast_histogram, fast_lines = self._scan_pages([fast_pages[indices[0]]], profile, session.deadline_at)
+            fast_cost = time.monotonic() - fast_start
+
+            if fast_lines and fast_cost < page_cost:
+                if indices[0] == 0:
+                    session.first_page_lines = fast_lines[0]
+                if fast_cost * (len(indices) - 1) <= budget():
+                    session.strategy = STRATEGY_FAST_ENGINE
+                    rest_histogram, rest_lines = self._scan_pages([fast_pages[index] for index in indices[1:]],
+                                                                  profile, session.deadline_at)
+                    return self._extend_scan(session, fast_histogram, [indices[0] + 1], fast_lines,
+                                             rest_histogram, [index + 1 for index in indices[1:]], rest_lines)
+
+                # Sample with the cheaper engine, keeping its first page
+                histogram, page_numbers, page_lines = fast_histogram, [indices[0] + 1], fast_lines
+                pages, page_cost, rest = fast_pages, fast_cost, indices[1:]
+
+        sample_size = min(int(budget() / page_cost) if page_cost > 0 else len(rest), len(rest))
+        if sample_size < 1:
+            session.strategy = STRATEGY_TITLE_ONLY
+            return FontHistogram(), [], []
+
+        # Evenly spaced over the unread pages, so every part of the document is represented
+        sample = [rest[len(rest) * i // sample_size] for i in range(sample_size)]
+        session.strategy = STRATEGY_SAMPLED
+        logger.info(f"Sampling {len(sample)} of {len(rest)} remaining pages")
+        sample_histogram, sample_lines = self._scan_pages([pages[index] for index in sample], profile,
+                                                          session.deadline_at)
+        return self._extend_scan(session, histogram, page_numbers, page_lines,
+                                 sample_histogram, [index + 1 for index in sample], sample_lines)
+
+    @staticmethod
+    def _extend_scan(session: PDFDocumentSession, histogram: FontHistogram, page_numbers: List[int],
+                     page_lines: List[List[LineRecord]], more_histogram: FontHistogram, more_numbers: List[int],
+                     more_lines: List[List[LineRecord]]) -> Tuple[FontHistogram, List[int], List[List[LineRecord]]]:
+        """
+        Append a follow-up scan; a scan cut short by the deadline marks the
+        result as truncated
+        """
+        histogram.merge(more_histogram)
+        if len(more_lines) < len(more_numbers):
+            logger.warning(f"Deadline reached after {len(page_lines) + len(more_lines)} pages")
+            session.strategy = STRATEGY_TRUNCATED
+        return histogram, page_numbers + more_numbers[:len(more_lines)], page_lines + more_lines
+
+    def _scan_pages_parallel(self, pdf_path: str, start: int, stop: int, profile: StageProfile,
+                             deadline_at: Optional[float] = None) -> Tuple[FontHistogram, List[List[LineRecord]]]:
+        """
+        Split the page range [start, stop) across worker processes, then merge
+        the partial histograms and line caches in page order (worker stage
+        times are summed, so they can exceed the elapsed time).
+
+        With ``deadline_at`` workers stop at the deadline, chunks not started
+        by then are cancelled, and the result ends at the first page not read.
+        """
+        # A few chunks per worker keeps the processes evenly loaded
+        page_count = stop - start
+        chunk_count = min(page_count, self.page_workers * 4)
+        bounds = [start + page_count * i // chunk_count for i in range(chunk_count + 1)]
+        ranges = list(zip(bounds[:-1], bounds[1:]))
+
+        logger.info(f"Analyzing {page_count} pages in {len(ranges)} chunks on {self.page_workers} processes")
+
+        ctx = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+        # Workers get the deadline as wall-clock time; monotonic clocks are per process
+        expires_at = time.time() + (deadline_at - time.monotonic()) if deadline_at is not None else None
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.page_workers, mp_context=ctx) as pool:
+            futures = [pool.submit(_scan_page_range, self, pdf_path, start, stop, expires_at)
+                       for start, stop in ranges]
+            if deadline_at is not None:
+                concurrent.futures.wait(futures, timeout=max(0.0, deadline_at - time.monotonic()))
+                for future in futures:
+                    future.cancel()  # Running chunks stop by themselves
+            partials = [None if future.cancelled() else future.result() for future in futures]
+
+        histogram = FontHistogram()
+        page_lines = []
+        for (start, stop), partial in zip(ranges, partials):
+            if partial is None:
+                break
+            partial_histogram, partial_lines, partial_profile = partial
+            histogram.merge(partial_histogram)
+            page_lines.extend(partial_lines)
+            profile.merge(partial_profile)
+            if len(partial_lines) < stop - start:
+                break  # Cut short by the deadline; later chunks would leave a gap
+
+        return histogram, page_lines
+
+    def _scan_pages(self, pages, profile: StageProfile,
+                    deadline_at: Optional[float] = None) -> Tuple[FontHistogram, List[List[LineRecord]]]:
+        """
+        Accumulate the font histogram and line records for a run of pages,
+        stopping before the next page once ``deadline_at`` has passed
+        """
+        histogram = FontHistogram()
+        page_lines = []
+
+        for page in pages:
+            if deadline_at is not None and time.monotonic() >= deadline_at:
+                break
 
-        total_chars = 0
+            with profile.stage("char_extraction"):
+                chars = page.chars
+            profile.count("char_extraction", pages=1, chars=len(chars))
 
-        for page in pdf.pages:
-            for char in page.chars:
-                font_size = round(char['size'], 1)
-                font_name = char.get('fontname', '')
+            with profile.stage("font_statistics"):
+                histogram.add_chars(chars)
 
-                font_stats[font_size]['count'] += 1
-                font_stats[font_size]['is_bold'] = font_stats[font_size]['is_bold'] or ('bold' in font_name.lower())
+            with profile.stage("line_grouping"):
+                lines = self._build_line_records(chars)
+            profile.count("line_grouping", lines=len(lines))
+            page_lines.append(lines)
 
-                if len(font_stats[font_size]['sample_text']) < 50:
-                    font_stats[font_size]['sample_text'] += char['text']
+            # Only the line records are needed from here on
+            del chars
+            page.flush_cache()
 
-                font_stats[font_size]['y_positions'].append(char['top'])
-                total_chars += 1
+        return histogram, page_lines
 
-        # Calculate relative frequency
-        for size in font_stats:
-            font_stats[size]['frequency'] = font_stats[size]['count'] / total_chars if total_chars > 0 else 0
+    def _build_line_records(self, chars) -> List[LineRecord]:
+        """
+        Group characters into lines and summarize each line as a LineRecord.
+
+        Positions and sizes are pulled into arrays once per page; line breaks,
+        each line's dominant rounded size and its top are found in bulk.
+        """
+        if not chars:
+            return []
+
+        order, starts, tops = self._line_layout(chars)
+        char_count = len(order)
+        ends = starts[1:] + [char_count]
+        sorted_chars = [chars[i] for i in order.tolist()]
+
+        size_array = np.fromiter((char['size'] for char in sorted_chars), dtype=np.float64, count=char_count)
+        sizes = size_array.tolist()
+        texts = [char['text'] for char in sorted_chars]
+
+        # Bold is a property of the font name; test each distinct name once
+        font_names = [char.get('fontname', '') for char in sorted_chars]
+        bold_fonts = {name: 'bold' in name.lower() for name in set(font_names)}
+        bold = np.fromiter(map(bold_fonts.__getitem__, font_names), dtype=bool, count=char_count)
+        line_bold = np.logical_or.reduceat(bold, starts).tolist()
+
+        primary_sizes = self._dominant_line_sizes(size_array, starts)
+
+        records = []
+        for line_index, (start, end) in enumerate(zip(starts, ends)):
+            records.append(LineRecord(
+                text=''.join(texts[start:end]),
+                font_size=primary_sizes[line_index],
+                avg_font_size=sum(sizes[start:end]) / (end - start),
+                top=tops[start],  # Lines are sorted by top, so the first char is the highest
+                is_bold=line_bold[line_index]
+            ))
+
+        return records
+
+    @staticmethod
+    def _line_layout(chars, tolerance: float = 5.0) -> Tuple[np.ndarray, List[int], List[float]]:
+        """
+        Reading order of ``chars`` (by top, then x0), the index where each
+        line starts in that order, and the tops in that order.
 
-        return dict(font_stats)
+        A line is anchored at its first character and takes every following
+        character less than ``tolerance`` points lower.
+        """
+        count = len(chars)
+        tops = np.fromiter((char['top'] for char in chars), dtype=np.float64, count=count)
+        x0s = np.fromiter((char['x0'] for char in chars), dtype=np.float64, count=count)
+
+        # lexsort is stable, matching sorted(chars, key=(top, x0)) on ties
+        order = np.lexsort((x0s, tops))
+        sorted_tops = tops[order]
+        top_values = sorted_tops.tolist()
+
+        starts = []
+        start = 0
+        while start < count:
+            starts.append(start)
+            anchor = top_values[start]
+            end = max(int(np.searchsorted(sorted_tops, anchor + tolerance, side='left')), start + 1)
+
+            # searchsorted compares against the rounded sum; settle on the exact test
+            while end > start + 1 and not top_values[end - 1] - anchor < tolerance:
+                end -= 1
+            while end < count and top_values[end] - anchor < tolerance:
+                end += 1
+            start = end
+
+        return order, starts, top_values
+
+    @staticmethod
+    def _dominant_line_sizes(sizes: np.ndarray, starts: List[int]) -> List[Optional[float]]:
+        """
+        Most common size (rounded to 1 decimal, zero sizes ignored) of every
+        line, ties going to the size seen first on the line; None for lines
+        without sized characters
+        """
+        line_count = len(starts)
+        line_ids = np.zeros(len(sizes), dtype=np.int64)
+        line_ids[starts[1:]] = 1
+        line_ids = np.cumsum(line_ids)
+
+        sized = np.flatnonzero(sizes != 0)
+        if not len(sized):
+            return [None] * line_count
+
+        # Round each distinct size once with Python's round() so values match
+        # the previous per-character round(size, 1) exactly
+        distinct, inverse = np.unique(sizes[sized], return_inverse=True)
+        rounded = [round(size, 1) for size in distinct.tolist()]
+        rounded_values = sorted(set(rounded))
+        code_of = {value: code for code, value in enumerate(rounded_values)}
+        codes = np.array([code_of[value] for value in rounded], dtype=np.int64)[inverse.ravel()]
+
+        # Count (line, size) pairs and remember where each first appeared
+        keys = line_ids[sized] * len(rounded_values) + codes
+        pair_keys, first_seen, counts = np.unique(keys, return_index=True, return_counts=True)
+        pair_lines = pair_keys // len(rounded_values)
+
+        # Per line: highest count first, then earliest first occurrence
+        ranking = np.lexsort((first_seen, -counts, pair_lines))
+        ranked_lines = pair_lines[ranking]
+        winners = ranking[np.flatnonzero(np.r_[True, ranked_lines[1:] != ranked_lines[:-1]])]
+
+        primary_sizes: List[Optional[float]] = [None] * line_count
+        for line_id, code in zip(pair_lines[winners].tolist(), (pair_keys[winners] % len(rounded_values)).tolist()):
+            primary_sizes[line_id] = rounded_values[code]
+        return primary_sizes
 
     def _identify_heading_fonts(self, font_stats: Dict[float, Dict]) -> Dict[float, str]:
         """
@@ -184,16 +1185,8 @@ class PDFOutlineExtractor:
             return {}
 
         # --- DATASET-DRIVEN FONT SIZE TO HEADING LEVEL MAPPING ---
-        # This mapping should be updated/tuned as new sample PDFs are added.
-        # Key: font size (rounded to 1 decimal), Value: heading level ("H1", "H2", ...)
-        dataset_font_heading_map = {
-            24.0: "H1",  # e.g., "Overview" title
-            20.0: "H1",  # e.g., major section
-            18.0: "H1",  # e.g., "3. Syllabus"
-            16.0: "H2",  # e.g., "3.1 Intended Audience"
-            14.0: "H2",  # e.g., subsection
-            12.0: "H3",  # e.g., minor heading
-        }
+        # See DATASET_FONT_HEADING_MAP on the class
+        dataset_font_heading_map = self.DATASET_FONT_HEADING_MAP
 
         # Sort fonts by size (descending)
         sorted_fonts = sorted(font_stats.keys(), reverse=True)
@@ -232,29 +1225,24 @@ class PDFOutlineExtractor:
         # --- END: Easily tune dataset_font_heading_map above for new samples ---
         return heading_fonts
 
-    def _extract_page_headings(self, page, heading_fonts: Dict[float, str], page_num: int) -> List[Dict]:
+    def _extract_page_headings(self, lines: List[LineRecord], heading_fonts: Dict[float, str], page_num: int) -> List[Dict]:
         """
-        Extract headings from a single page with improved text cleaning and simplified output
+        Extract headings from a page's cached lines with improved text cleaning and simplified output
         """
         headings = []
 
-        # Group characters by line
-        lines = self._group_chars_by_line(page.chars)
-
         for line in lines:
-            line_text = ''.join(char['text'] for char in line).strip()
+            line_text = line.text.strip()
 
             if not line_text or len(line_text) < 2:  # Allow shorter headings
                 continue
 
             # Check if this line uses a heading font
-            line_font_sizes = [round(char['size'], 1) for char in line if char['size']]
+            primary_font_size = line.font_size
 
-            if not line_font_sizes:
+            if primary_font_size is None:
                 continue
 
-            primary_font_size = Counter(line_font_sizes).most_common(1)[0][0]
-
             if primary_font_size in heading_fonts:
                 clean_text = self._clean_heading_text_improved(line_text)
 
@@ -264,7 +1252,7 @@ class PDFOutlineExtractor:
                         "level": heading_fonts[primary_font_size],
                         "text": clean_text,
                         "page": page_num,
-                        "y_position": min(char['top'] for char in line)  # For sorting only
+                        "y_position": line.top  # For sorting only
                     })
 
         return headings
@@ -295,82 +1283,58 @@ class PDFOutlineExtractor:
 
         return ""
 
-    def _group_chars_by_line(self, chars) -> List[List[Dict]]:
-        """
-        Group characters by line based on y-position
-        """
-        if not chars:
-            return []
-
-        # Sort by y-position then x-position
-        sorted_chars = sorted(chars, key=lambda c: (c['top'], c['x0']))
-
-        lines = []
-        current_line = [sorted_chars[0]]
-        current_y = sorted_chars[0]['top']
-
-        for char in sorted_chars[1:]:
-            # If y-position is close to current line, add to current line
-            if abs(char['top'] - current_y) < 5:  # 5 point tolerance
-                current_line.append(char)
-            else:
-                # Start new line
-                lines.append(current_line)
-                current_line = [char]
-                current_y = char['top']
-
-        if current_line:
-            lines.append(current_line)
-
-        return lines
-
-    def _extract_title(self, pdf_path: str) -> str:
+    def _extract_title(self, session: PDFDocumentSession) -> str:
         """
         Extract document title using multiple methods
         """
         try:
             # Method 1: PDF metadata
-            doc = pymupdf.open(pdf_path)
-            title = doc.metadata.get('title', '') or ''
-            doc.close()
+            title = session.metadata.get('title', '') or ''
 
             if title:
                 return self._clean_title_text(title)
 
-            # Method 2: First page analysis
-            with pdfplumber.open(pdf_path) as pdf:
-                if pdf.pages:
-                    title = self._extract_title_from_page(pdf.pages[0])
+            # Method 2: First page analysis (reuses the session's page-1 layout)
+            title = self._extract_session_page_title(session)
 
             return title or ""
 
         except Exception as e:
             logger.warning(f"Title extraction failed: {str(e)}")
+            session.errors.append(f"title: {str(e)}")
             return ""
 
-    def _extract_title_from_page(self, page) -> str:
+    def _extract_session_page_title(self, session: PDFDocumentSession) -> str:
+        """
+        Analyze the first page for a title once per session
+        """
+        if session.first_page_title is None:
+            if session.first_page_lines is None:
+                page = session.first_page
+                session.first_page_lines = self._build_line_records(page.chars) if page is not None else []
+            session.first_page_title = self._extract_title_from_lines(session.first_page_lines)
+        return session.first_page_title
+
+    def _extract_title_from_lines(self, lines: List[LineRecord]) -> str:
         """
-        Extract title from first page by finding largest/centered text and combining title elements
+        Extract title from first-page lines by finding largest/centered text and combining title elements
         """
         try:
-            lines = self._group_chars_by_line(page.chars)
-
             if not lines:
                 return ""
 
             # Look for specific title patterns in upper portion of page
             title_candidates = []
-            page_height = page.height
 
             for i, line in enumerate(lines[:20]):  # Check more lines for multi-part titles
-                line_text = ''.join(char['text'] for char in line).strip()
+                line_text = line.text.strip()
 
                 if len(line_text) < 3:  # Allow shorter text for title parts
                     continue
 
                 # Calculate line metrics
-                avg_font_size = sum(char['size'] for char in line) / len(line)
-                line_y = min(char['top'] for char in line)
+                avg_font_size = line.avg_font_size
+                line_y = line.top
 
                 # Look for specific title words that match expected output
                 title_words = ['overview', 'foundation', 'level', 'extensions']
@@ -499,12 +1463,271 @@ class PDFOutlineExtractor:
 
         return cleaned[:200] if cleaned else ""  # Limit title length
 
-def process_pdfs():
+def _scan_page_range(extractor: PDFOutlineExtractor, pdf_path: str, start: int, stop: int,
+                     expires_at: Optional[float] = None):
+    """
+    Worker entry point for page-parallel analysis: scan pages [start, stop),
+    stopping at ``expires_at`` (wall clock)
+    """
+    deadline_at = time.monotonic() + (expires_at - time.time()) if expires_at is not None else None
+    with PDFDocumentSession(pdf_path, engine=extractor.engine) as session:
+        histogram, page_lines = extractor._scan_pages(session.pages[start:stop], session.profile, deadline_at)
+        return histogram, page_lines, session.profile
+
+
+EMPTY_RESULT = {"title": "", "outline": []}
+
+
+def save_result(output_file: Path, result: Dict[str, Any]) -> None:
+    """
+    Write one outline JSON file (shared by all drivers). The JSON goes to a
+    temp file in the same directory first and is renamed into place, so
+    readers never see a partially written result.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=output_file.parent, prefix=f".{output_file.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, output_file)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def count_pages(pdf_path: str) -> int:
+    """
+    Cheap page count used to schedule large documents first (0 if unreadable)
+    """
+    try:
+        with pymupdf.open(pdf_path) as doc:
+            return doc.page_count
+    except Exception:
+        return 0
+
+
+def extract_document(extractor: PDFOutlineExtractor, pdf_file: Path, output_dir: Path) -> Dict[str, Any]:
+    """
+    Extract one PDF, writing the extractor's optional profiling artifacts
+    (``<stem>.profile.json``, cProfile/pyinstrument output) next to its result.
+    Raises ExtractionError for a document that could not be fully processed.
+    """
+    if not extractor.profile_report and extractor.profiler is None:
+        return extractor.extract_outline(str(pdf_file), raise_errors=True)
+
+    profile = StageProfile()
+    with external_profiler(extractor.profiler, output_dir / pdf_file.stem):
+        result = extractor.extract_outline(str(pdf_file), profile=profile, raise_errors=True)
+
+    if extractor.profile_report:
+        report = {"file": pdf_file.name, "engine": extractor.engine, **profile.report()}
+        report_file = output_dir / f"{pdf_file.stem}.profile.json"
+        save_result(report_file, report)
+        logger.info(f"Saved stage profile to: {report_file}")
+
+    return result
+
+
+def _extract_in_worker(pdf_path: str, output_dir: Path, extractor: PDFOutlineExtractor, conn) -> None:
+    """
+    Child-process entry point: extract one PDF and send the result to the parent
+    """
+    try:
+        try:
+            result = extract_document(extractor, Path(pdf_path), output_dir)
+        except ExtractionError as e:
+            result = e  # The parent saves the partial result without caching it
+        conn.send(result)
+    finally:
+        conn.close()
+
+
+def _process_pdfs_parallel(pdf_files: List[Path], output_dir: Path, extractor: PDFOutlineExtractor,
+                           workers: int, timeout: Optional[float],
+                           on_result: Optional[Callable[[Path, Dict[str, Any]], None]] = None) -> None:
+    """
+    Extract PDFs in up to ``workers`` child processes, one process per file so a
+    crash or hang only loses that file. Largest documents are started first.
+    """
+    ctx = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+
+    # Longest-processing-time-first scheduling avoids a big file finishing last
+    queue = sorted(pdf_files, key=lambda p: (-count_pages(str(p)), p.name))
+    queue.reverse()  # pop() from the end
+
+    running = {}  # sentinel -> (process, conn, pdf_file, started_at)
+
+    def finish(pdf_file: Path, result: Optional[Dict[str, Any]]) -> None:
+        output_file = output_dir / f"{pdf_file.stem}.json"
+        try:
+            if result is None:
+                save_result(output_file, EMPTY_RESULT)
+            elif isinstance(result, ExtractionError):
+                save_result(output_file, result.result)
+            else:
+                save_result(output_file, result)
+                logger.info(f"Saved result to: {output_file}")
+                if on_result is not None:
+                    on_result(pdf_file, result)
+        except Exception as e:
+            logger.error(f"Failed to write {output_file}: {str(e)}")
+
+    while queue or running:
+        # Keep every worker slot busy
+        while queue and len(running) < workers:
+            pdf_file = queue.pop()
+            logger.info(f"Processing: {pdf_file.name}")
+            parent_conn, child_conn = ctx.Pipe(duplex=False)
+            # Not a daemon, so the extractor may start its own page-parallel workers
+            process = ctx.Process(target=_extract_in_worker, args=(str(pdf_file), output_dir, extractor, child_conn))
+            process.start()
+            child_conn.close()
+            running[process.sentinel] = (process, parent_conn, pdf_file, time.monotonic())
+
+        # Wake up on a result, a worker exit, or the nearest deadline
+        wait_timeout = None
+        if timeout is not None:
+            now = time.monotonic()
+            wait_timeout = max(0.0, min(started + timeout - now for _, _, _, started in running.values()))
+        handles = [conn for _, conn, _, _ in running.values()] + list(running.keys())
+        ready = set(multiprocessing.connection.wait(handles, timeout=wait_timeout))
+
+        for sentinel, (process, conn, pdf_file, started) in list(running.items()):
+            result = None
+            if conn in ready or sentinel in ready:
+                try:
+                    if conn.poll():
+                        result = conn.recv()
+                except (EOFError, OSError):
+                    result = None
+                if result is None:
+                    process.join(1)
+                    logger.error(f"Failed to process {pdf_file}: worker exited with code {process.exitcode}")
+            elif timeout is not None and time.monotonic() - started >= timeout:
+                logger.error(f"Failed to process {pdf_file}: timed out after {timeout:.1f} seconds")
+                process.kill()
+            else:
+                continue
+
+            process.join()
+            conn.close()
+            del running[sentinel]
+            finish(pdf_file, result)
+
+
+def process_files(pdf_files: List[Path], output_dir: Path, extractor: PDFOutlineExtractor,
+                  workers: int = 1, timeout: Optional[float] = None,
+                  cache: Optional[OutlineCache] = None) -> Dict[Path, bool]:
+    """
+    Extract ``pdf_files`` into ``output_dir`` serially or with worker processes,
+    answering unchanged files from ``cache`` when one is given. Returns, per
+    file, whether its result was extracted cleanly (or cached) and written;
+    failed, timed-out and partial extractions still get a JSON file.
+    """
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(pdf_files))
+
+    cache_keys = {}
+    succeeded = {pdf_file: False for pdf_file in pdf_files}
+
+    def lookup(pdf_file: Path) -> Optional[Dict[str, Any]]:
+        """Return a cached result without opening the PDF, or None"""
+        if cache is None:
+            return None
+        try:
+            cache_keys[pdf_file] = OutlineCache.make_key(str(pdf_file), extractor.cache_fingerprint())
+        except OSError as e:
+            logger.warning(f"Cannot hash {pdf_file} for the cache: {str(e)}")
+            return None
+        result = cache.get(cache_keys[pdf_file])
+        if result is not None:
+            logger.info(f"Cache hit: {pdf_file.name}")
+        return result
+
+    def remember(pdf_file: Path, result: Dict[str, Any]) -> None:
+        # Degraded results depend on how fast this run was; never reuse them
+        strategy = result.get("metadata", {}).get("strategy")
+        if strategy is not None and strategy not in EXACT_STRATEGIES:
+            return
+        if cache is not None and pdf_file in cache_keys:
+            try:
+                cache.put(cache_keys[pdf_file], result)
+            except OSError as e:
+                logger.warning(f"Cannot cache result for {pdf_file}: {str(e)}")
+
+    if workers > 1 or timeout is not None:
+        # Serve cache hits here; only misses are sent to worker processes
+        pending = []
+        for pdf_file in pdf_files:
+            result = lookup(pdf_file)
+            if result is None:
+                pending.append(pdf_file)
+            else:
+                save_result(output_dir / f"{pdf_file.stem}.json", result)
+                succeeded[pdf_file] = True
+
+        def on_result(pdf_file: Path, result: Dict[str, Any]) -> None:
+            # Only called for clean results that were written
+            remember(pdf_file, result)
+            succeeded[pdf_file] = True
+
+        if pending:
+            logger.info(f"Using {min(workers, len(pending))} worker processes")
+            _process_pdfs_parallel(pending, output_dir, extractor, min(workers, len(pending)), timeout, on_result)
+        return succeeded
+
+    for pdf_file in pdf_files:
+        try:
+            logger.info(f"Processing: {pdf_file.name}")
+
+            # Extract outline (unless an identical file was processed before)
+            result = lookup(pdf_file)
+            clean = True
+            if result is None:
+                try:
+                    result = extract_document(extractor, pdf_file, output_dir)
+                    remember(pdf_file, result)
+                except ExtractionError as e:
+                    # Partial results are written, but only clean extractions are cached
+                    result, clean = e.result, False
+
+            # Save result
+            output_file = output_dir / f"{pdf_file.stem}.json"
+            save_result(output_file, result)
+            succeeded[pdf_file] = clean
+
+            logger.info(f"Saved result to: {output_file}")
+
+        except Exception as e:
+            logger.error(f"Failed to process {pdf_file}: {str(e)}")
+            # Save empty result for failed files
+            save_result(output_dir / f"{pdf_file.stem}.json", EMPTY_RESULT)
+
+    return succeeded
+
+
+def process_pdfs(engine: str = ENGINE_PDFPLUMBER, workers: int = 1, timeout: Optional[float] = None,
+                 input_dir: str = "/app/input", output_dir: str = "/app/output", page_workers: int = 1,
+                 cache_dir: Optional[str] = None, cache_max_bytes: int = 256 * 1024 * 1024,
+                 profile_report: bool = False, profiler: Optional[str] = None, deadline: Optional[float] = None):
     """
     Main processing function - process all PDFs in input directory
+
+    ``workers`` > 1 extracts files in parallel child processes (0 = one per CPU);
+    ``timeout`` bounds the seconds spent on any single file in that mode.
+    ``page_workers`` > 1 splits the pages of very large documents across processes.
+    ``cache_dir`` enables the content-addressed result cache.
+    ``profile_report`` writes per-stage timings next to each result and
+    ``profiler`` ("cprofile" or "pyinstrument") profiles every extraction.
+    ``deadline`` is a per-document time budget in seconds; documents projected
+    to overrun it are analyzed with a cheaper strategy.
     """
-    input_dir = Path("/app/input")
-    output_dir = Path("/app/output")
+    input_dir = Path(input_dir)
+    output_dir = Path(output_dir)
 
     # Create output directory if it doesn't exist
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -522,30 +1745,74 @@ def process_pdfs():
 
     logger.info(f"Found {len(pdf_files)} PDF files to process")
 
-    extractor = PDFOutlineExtractor()
+    extractor = PDFOutlineExtractor(engine=engine, page_workers=page_workers,
+                                    profile_report=profile_report, profiler=profiler, deadline=deadline)
+    cache = OutlineCache(cache_dir, cache_max_bytes) if cache_dir else None
 
-    for pdf_file in pdf_files:
-        try:
-            logger.info(f"Processing: {pdf_file.name}")
+    process_files(pdf_files, output_dir, extractor, workers, timeout, cache)
+    log_cache_stats(cache)
 
-            # Extract outline
-            result = extractor.extract_outline(str(pdf_file))
 
-            # Save result
-            output_file = output_dir / f"{pdf_file.stem}.json"
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+def log_cache_stats(cache: Optional[OutlineCache]) -> None:
+    """
+    Log the result cache counters at the end of a run (shared by all drivers)
+    """
+    if cache is not None:
+        stats = cache.stats()
+        logger.info(f"Result cache: {stats['hits']} hits, {stats['misses']} misses, "
+                    f"{stats['stores']} stores, {stats['evictions']} evictions")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Extract titles and H1-H3 outlines from PDFs")
+    parser.add_argument("--input-dir", default="/app/input", help="Directory containing *.pdf files")
+    parser.add_argument("--output-dir", default="/app/output", help="Directory for the JSON results")
+    parser.add_argument("--engine", choices=LAYOUT_ENGINES,
+                        default=os.environ.get("OUTLINE_ENGINE", ENGINE_PDFPLUMBER),
+                        help="Character layout engine for the font-based fallback")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("OUTLINE_WORKERS", "1")),
+                        help="Parallel worker processes (0 = one per CPU, 1 = serial)")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Per-file time limit in seconds; hung files get an empty result")
+    parser.add_argument("--cache-dir", default=os.environ.get("OUTLINE_CACHE_DIR"),
+                        help="Directory for the content-addressed result cache (disabled if unset)")
+    parser.add_argument("--cache-max-mb", type=int, default=int(os.environ.get("OUTLINE_CACHE_MAX_MB", "256")),
+                        help="Cache size limit in MB; least recently used entries are evicted")
+    parser.add_argument("--page-workers", type=int, default=int(os.environ.get("OUTLINE_PAGE_WORKERS", "1")),
+                        help="Processes for page-parallel analysis of very large documents")
+    parser.add_argument("--deadline", type=float,
+                        default=float(os.environ["OUTLINE_DEADLINE"]) if os.environ.get("OUTLINE_DEADLINE") else None,
+                        help="Per-document time budget in seconds; slower documents are sampled or use a "
+                             "faster engine, and results record the strategy under \"metadata\"")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and process new or modified PDFs as they appear")
+    parser.add_argument("--poll-interval", type=float, default=2.0,
+                        help="Seconds between directory scans in watch mode without inotify")
+    parser.add_argument("--profile-report", action="store_true",
+                        default=os.environ.get("OUTLINE_PROFILE_REPORT", "") not in ("", "0"),
+                        help="Write per-stage timings to <name>.profile.json next to each result")
+    parser.add_argument("--profiler", choices=PROFILERS, default=os.environ.get("OUTLINE_PROFILER") or None,
+                        help="Profile each extraction with cProfile (.prof) or pyinstrument (.profile.html)")
+    return parser.parse_args(argv)
 
-            logger.info(f"Saved result to: {output_file}")
-
-        except Exception as e:
-            logger.error(f"Failed to process {pdf_file}: {str(e)}")
-            # Save empty result for failed files
-            output_file = output_dir / f"{pdf_file.stem}.json"
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump({"title": "", "outline": []}, f, indent=2)
 
 if __name__ == "__main__":
+    args = parse_args()
+
+    if args.watch:
+        from outline_watch import watch_pdfs
+
+        logger.info("Starting PDF Outline Extraction in watch mode")
+        watch_pdfs(engine=args.engine, workers=args.workers, timeout=args.timeout,
+                   input_dir=args.input_dir, output_dir=args.output_dir, page_workers=args.page_workers,
+                   cache_dir=args.cache_dir, cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+                   poll_interval=args.poll_interval, profile_report=args.profile_report, profiler=args.profiler,
+                   deadline=args.deadline)
+        raise SystemExit(0)
+
     logger.info("Starting PDF Outline Extraction")
-    process_pdfs()
+    process_pdfs(engine=args.engine, workers=args.workers, timeout=args.timeout,
+                 input_dir=args.input_dir, output_dir=args.output_dir, page_workers=args.page_workers,
+                 cache_dir=args.cache_dir, cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+                 profile_report=args.profile_report, profiler=args.profiler, deadline=args.deadline)
     logger.info("Processing complete")
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the outline extractor on generated PDFs.
+
+The corpus is built locally with PyMuPDF from fixed seeds, so every run
+measures the same documents. Each document is timed end to end and per
+method (embedded outline, font-based analysis, title extraction); the report
+is JSON with pages/sec, p50/p95 latency, peak RSS and a check against the
+10 seconds per 50 pages budget.
+
+Usage:
+    python outline_benchmark.py --output bench.json
+    python outline_benchmark.py --baseline bench.json  # flag regressions
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
+
+import pymupdf
+
+from extract_outline import PDFOutlineExtractor, PDFDocumentSession, LAYOUT_ENGINES, ENGINE_PDFPLUMBER
+
+logger = logging.getLogger(__name__)
+
+# Processing budget from the challenge: 10 seconds for a 50-page PDF
+BUDGET_SECONDS = 10.0
+BUDGET_PAGES = 50
+
+# name, pages, body lines per page, body font, embedded bookmarks
+BENCHMARK_CORPUS = [
+    {"name": "single_page_sparse", "pages": 1, "lines_per_page": 10, "font": "helv", "bookmarks": False},
+    {"name": "short_report", "pages": 8, "lines_per_page": 30, "font": "tiro", "bookmarks": False},
+    {"name": "short_report_bookmarked", "pages": 8, "lines_per_page": 30, "font": "tiro", "bookmarks": True},
+    {"name": "manual_dense", "pages": 50, "lines_per_page": 55, "font": "helv", "bookmarks": False},
+    {"name": "manual_dense_bookmarked", "pages": 50, "lines_per_page": 55, "font": "helv", "bookmarks": True},
+    {"name": "code_listing", "pages": 50, "lines_per_page": 60, "font": "cour", "bookmarks": False},
+    {"name": "book_sparse", "pages": 200, "lines_per_page": 20, "font": "tiro", "bookmarks": False},
+]
+
+# Heading styles: level -> (font size, bold base-14 font)
+HEADING_STYLES = {1: (20.0, "hebo"), 2: (16.0, "hebo"), 3: (12.0, "hebo")}
+BODY_FONT_SIZE = 10.0
+
+WORDS = (
+    "analysis system data process method result design model section value report table figure "
+    "performance control review project market service network budget policy quality support "
+    "training program framework strategy operation document summary overview planning schedule"
+).split()
+
+
+def generate_pdf(spec: Dict[str, Any], pdf_path: Path, seed: int = 0) -> None:
+    """
+    Write one synthetic document; the same spec and seed give the same layout
+    """
+    rng = random.Random(f"{spec['name']}:{seed}")
+    doc = pymupdf.open()
+    toc = []
+    width, height = pymupdf.paper_size("a4")
+    margin = 56.0
+
+    # Title block on the first page
+    title = f"{spec['name'].replace('_', ' ').title()} Benchmark Document"
+
+    for page_index in range(spec["pages"]):
+        page = doc.new_page(width=width, height=height)
+        y = margin + 20.0
+
+        if page_index == 0:
+            page.insert_text((margin, y), title, fontsize=24.0, fontname="hebo")
+            y += 40.0
+
+        body_lines = spec["lines_per_page"]
+        for line_index in range(body_lines):
+            # Start a new section every few lines, deeper levels more often
+            if line_index % 12 == 0:
+                level = 1 if line_index == 0 and page_index % 4 == 0 else (2 if line_index % 24 == 0 else 3)
+                level = min(level, toc[-1][0] + 1 if toc else 1)  # Bookmarks cannot skip levels
+                size, font = HEADING_STYLES[level]
+                heading = f"{len(toc) + 1}. {' '.join(rng.choice(WORDS).title() for _ in range(rng.randint(2, 4)))}"
+                if y + size * 2 > height - margin:
+                    break
+                y += size * 0.6
+                page.insert_text((margin, y), heading, fontsize=size, fontname=font)
+                toc.append([level, heading, page_index + 1])
+                y += size * 1.4
+
+            if y + BODY_FONT_SIZE * 1.4 > height - margin:
+                break
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 14)))
+            page.insert_text((margin, y), text.capitalize() + ".", fontsize=BODY_FONT_SIZE, fontname=spec["font"])
+            y += BODY_FONT_SIZE * 1.4
+
+    if spec["bookmarks"]:
+        doc.set_toc(toc)
+
+    # Fixed metadata and no random file ID keep the output byte-stable
+    doc.set_metadata({"title": "", "creationDate": "D:20250101000000", "modDate": "D:20250101000000",
+                      "producer": "outline_benchmark", "creator": "outline_benchmark"})
+    doc.save(str(pdf_path), garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+
+
+def build_corpus(work_dir: Path, max_pages: Optional[int] = None, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate the benchmark corpus into ``work_dir`` and return the specs with paths
+    """
+    work_dir.mkdir(parents=True, exist_ok=True)
+    corpus = []
+    for spec in BENCHMARK_CORPUS:
+        if max_pages is not None and spec["pages"] > max_pages:
+            continue
+        pdf_path = work_dir / f"{spec['name']}.pdf"
+        generate_pdf(spec, pdf_path, seed)
+        corpus.append(dict(spec, path=pdf_path))
+    return corpus
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Linear-interpolated percentile (pct in 0-100) of a non-empty list
+    """
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _timed(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS; page workers count as children
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) * scale / (1024 * 1024), 1)
+
+
+def benchmark_document(extractor: PDFOutlineExtractor, doc: Dict[str, Any], repeats: int) -> Dict[str, Any]:
+    """
+    Time one document end to end and per method over ``repeats`` runs.
+
+    Every method gets a fresh session so none of them benefits from layout
+    another one already cached.
+    """
+    pdf_path = str(doc["path"])
+    timings = {"total": [], "pymupdf_outline": [], "font_based": [], "title": []}
+    result = None
+
+    def run_method(method: Callable[[PDFDocumentSession], Any]) -> Callable[[], Any]:
+        def run():
+            with PDFDocumentSession(pdf_path, engine=extractor.engine) as session:
+                method(session)
+        return run
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = extractor.extract_outline(pdf_path)
+        timings["total"].append(time.perf_counter() - start)
+
+        timings["pymupdf_outline"].append(_timed(run_method(extractor._extract_pymupdf_outline)))
+        timings["font_based"].append(_timed(run_method(extractor._extract_font_based_outline)))
+        timings["title"].append(_timed(run_method(extractor._extract_title)))
+
+    p50 = percentile(timings["total"], 50)
+    seconds_per_budget = p50 / doc["pages"] * BUDGET_PAGES
+
+    return {
+        "name": doc["name"],
+        "pages": doc["pages"],
+        "lines_per_page": doc["lines_per_page"],
+        "font": doc["font"],
+        "bookmarks": doc["bookmarks"],
+        "headings_found": len(result["outline"]) if result else 0,
+        "p50_seconds": round(p50, 4),
+        "p95_seconds": round(percentile(timings["total"], 95), 4),
+        "pages_per_second": round(doc["pages"] / p50, 2) if p50 > 0 else None,
+        "stages_p50_seconds": {stage: round(percentile(values, 50), 4)
+                               for stage, values in timings.items() if stage != "total"},
+        "seconds_per_50_pages": round(seconds_per_budget, 4),
+        "within_budget": seconds_per_budget <= BUDGET_SECONDS,
+    }
+
+
+def run_benchmark(engine: str = ENGINE_PDFPLUMBER, repeats: int = 3, max_pages: Optional[int] = None,
+                  work_dir: Optional[str] = None, page_workers: int = 1) -> Dict[str, Any]:
+    """
+    Generate the corpus, benchmark every document and build the JSON report
+    """
+    extractor = PDFOutlineExtractor(engine=engine, page_workers=page_workers)
+
+    with tempfile.TemporaryDirectory(prefix="outline-bench-") as tmp_dir:
+        corpus = build_corpus(Path(work_dir or tmp_dir), max_pages=max_pages)
+        documents = []
+        for doc in corpus:
+            logger.info(f"Benchmarking {doc['name']} ({doc['pages']} pages)")
+            documents.append(benchmark_document(extractor, doc, repeats))
+
+    latencies = [doc["p50_seconds"] for doc in documents]
+    total_pages = sum(doc["pages"] for doc in documents)
+    total_seconds = sum(latencies)
+
+    return {
+        "version": PDFOutlineExtractor.VERSION,
+        "engine": engine,
+        "page_workers": page_workers,
+        "repeats": repeats,
+        "python": platform.python_version(),
+        "pymupdf": pymupdf.VersionBind,
+        "cpu_count": os.cpu_count(),
+        "summary": {
+            "documents": len(documents),
+            "pages": total_pages,
+            "pages_per_second": round(total_pages / total_seconds, 2) if total_seconds > 0 else None,
+            "p50_seconds": round(percentile(latencies, 50), 4),
+            "p95_seconds": round(percentile(latencies, 95), 4),
+            "peak_rss_mb": _peak_rss_mb(),
+            "budget_seconds_per_50_pages": BUDGET_SECONDS,
+            "within_budget": all(doc["within_budget"] for doc in documents),
+        },
+        "documents": documents,
+    }
+
+
+def compare_reports(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Documents whose p50 latency grew by more than ``tolerance`` (e.g. 0.2 = 20%)
+    """
+    previous = {doc["name"]: doc for doc in baseline.get("documents", [])}
+    regressions = []
+    for doc in report["documents"]:
+        before = previous.get(doc["name"])
+        if not before or before["p50_seconds"] <= 0:
+            continue
+        ratio = doc["p50_seconds"] / before["p50_seconds"]
+        if ratio > 1.0 + tolerance:
+            regressions.append(f"{doc['name']}: {before['p50_seconds']:.3f}s -> {doc['p50_seconds']:.3f}s "
+                               f"({ratio:.2f}x)")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the PDF outline extractor on generated PDFs")
+    parser.add_argument("--engine", choices=LAYOUT_ENGINES, default=ENGINE_PDFPLUMBER,
+                        help="Layout engine for font-based analysis")
+    parser.add_argument("--page-workers", type=int, default=1,
+                        help="Processes for page-parallel analysis of very large documents")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per document; latencies are medians")
+    parser.add_argument("--max-pages", type=int, default=None, help="Skip corpus documents longer than this")
+    parser.add_argument("--work-dir", default=None, help="Keep the generated PDFs in this directory")
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", default=None, help="Earlier report to compare p50 latencies against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown against the baseline before failing (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    # Per-document extraction logs would drown the report
+    logging.getLogger("extract_outline").setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    report = run_benchmark(engine=args.engine, repeats=max(1, args.repeats), max_pages=args.max_pages,
+                           work_dir=args.work_dir, page_workers=args.page_workers)
+
+    failures = []
+    if not report["summary"]["within_budget"]:
+        failures.extend(f"{doc['name']}: {doc['seconds_per_50_pages']:.2f}s per {BUDGET_PAGES} pages exceeds budget"
+                        for doc in report["documents"] if not doc["within_budget"])
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_reports(report, json.load(f), args.tolerance)
+        report["regressions"] = regressions
+        failures.extend(regressions)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding='utf-8')
+        logger.info(f"Wrote benchmark report to {args.output}")
+    else:
+        print(output)
+
+    for failure in failures:
+        logger.error(failure)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache for PDF outline results
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+try:
+    import fcntl  # POSIX advisory locks serialize eviction between processes
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class OutlineCache:
+    """
+    Stores outline JSON keyed by PDF content hash plus extractor fingerprint.
+
+    Entries live in ``<cache_dir>/<key[:2]>/<key>.json`` and are written with a
+    temp file and an atomic rename, so concurrent readers never see partial
+    JSON. A hit refreshes the entry's mtime; when the cache grows past
+    ``max_bytes`` the least recently used entries are evicted under a lock.
+    """
+
+    LOCK_NAME = ".lock"
+    LOW_WATERMARK = 0.9  # Evict down to this fraction of max_bytes
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._approx_bytes = None  # Lazily measured, corrected on every eviction pass
+
+    @staticmethod
+    def make_key(pdf_path: str, fingerprint: str, chunk_size: int = 1024 * 1024) -> str:
+        """
+        Hash the PDF bytes together with the extractor fingerprint
+        """
+        digest = hashlib.sha256()
+        digest.update(fingerprint.encode('utf-8'))
+        digest.update(b'\0')
+        with open(pdf_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached result for ``key`` or None, counting hits and misses
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Touch for LRU ordering; a concurrent eviction may have removed it
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Atomically store ``result`` under ``key`` and evict if over budget
+        """
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        self.stores += 1
+        if self._approx_bytes is None:
+            self._approx_bytes = self._measure()
+        else:
+            self._approx_bytes += path.stat().st_size
+
+        if self._approx_bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        for shard in self.cache_dir.iterdir():
+            if not shard.is_dir():
+                continue
+            for entry in shard.glob("*.json"):
+                if entry.name.startswith(".tmp-"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue  # Removed by another process
+                yield entry, stat
+
+    def _measure(self) -> int:
+        return sum(stat.st_size for _, stat in self._entries())
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.cache_dir / self.LOCK_NAME, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def evict(self) -> None:
+        """
+        Remove least recently used entries until the cache fits its budget
+        """
+        with self._locked():
+            entries = sorted(self._entries(), key=lambda item: item[1].st_mtime)
+            total = sum(stat.st_size for _, stat in entries)
+            target = int(self.max_bytes * self.LOW_WATERMARK)
+
+            for entry, stat in entries:
+                if total <= target:
+                    break
+                try:
+                    entry.unlink()
+                except OSError:
+                    continue
+                total -= stat.st_size
+                self.evictions += 1
+
+            self._approx_bytes = total
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for this process since the cache was opened"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing for outline extraction and optional cProfile/pyinstrument hooks
+"""
+
+import cProfile
+import logging
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+try:
+    import pyinstrument  # Optional sampling profiler for --profiler pyinstrument
+except ImportError:
+    pyinstrument = None
+
+logger = logging.getLogger(__name__)
+
+PROFILER_CPROFILE = "cprofile"
+PROFILER_PYINSTRUMENT = "pyinstrument"
+PROFILERS = (PROFILER_CPROFILE, PROFILER_PYINSTRUMENT)
+
+
+class StageProfile:
+    """
+    Wall time, call count and processed items (pages, chars, lines, ...) for
+    each extraction stage of one document. Stages are reported in the order
+    they first ran; timing a stage costs two perf_counter() calls.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.total_seconds: Optional[float] = None
+
+    def _entry(self, name: str) -> Dict[str, float]:
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = {"seconds": 0.0, "calls": 0}
+        return entry
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time one call of stage ``name``"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self._entry(name)
+            entry["seconds"] += time.perf_counter() - start
+            entry["calls"] += 1
+
+    def count(self, name: str, **items: int) -> None:
+        """Add item counts (e.g. ``pages=1, chars=812``) to stage ``name``"""
+        entry = self._entry(name)
+        for item, value in items.items():
+            entry[item] = entry.get(item, 0) + value
+
+    def merge(self, other: "StageProfile") -> None:
+        """Fold in a profile from a page-parallel worker (times add up across processes)"""
+        for name, other_entry in other.stages.items():
+            entry = self._entry(name)
+            for item, value in other_entry.items():
+                entry[item] = entry.get(item, 0) + value
+
+    def report(self) -> Dict[str, Any]:
+        """JSON-ready per-stage breakdown"""
+        stages = {}
+        for name, entry in self.stages.items():
+            stages[name] = dict(entry, seconds=round(entry["seconds"], 6))
+
+        report = {"total_seconds": None, "stages": stages}
+        if self.total_seconds is not None:
+            report["total_seconds"] = round(self.total_seconds, 6)
+            # Time outside any stage (cleanup, bookkeeping, logging)
+            accounted = sum(entry["seconds"] for entry in self.stages.values())
+            report["unaccounted_seconds"] = round(max(0.0, self.total_seconds - accounted), 6)
+        return report
+
+
+@contextmanager
+def external_profiler(kind: Optional[str], output_stem: Path):
+    """
+    Run the block under cProfile (``<stem>.prof``) or pyinstrument
+    (``<stem>.profile.html``); a no-op when ``kind`` is None
+    """
+    if kind is None:
+        yield
+        return
+
+    if kind == PROFILER_PYINSTRUMENT and pyinstrument is None:
+        logger.warning("pyinstrument is not installed, skipping the profiler hook")
+        yield
+        return
+
+    if kind == PROFILER_CPROFILE:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            output_path = output_stem.with_name(f"{output_stem.name}.prof")
+            profiler.dump_stats(str(output_path))
+            logger.info(f"Saved cProfile stats to: {output_path}")
+        return
+
+    profiler = pyinstrument.Profiler()
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        output_path = output_stem.with_name(f"{output_stem.name}.profile.html")
+        output_path.write_text(profiler.output_html(), encoding='utf-8')
+        logger.info(f"Saved pyinstrument profile to: {output_path}")
@@ -0,0 +1,645 @@
+#!/usr/bin/env python3
+"""
+Resident outline extraction service: a warm worker pool behind a local HTTP API
+
+Endpoints:
+    POST /outline            PDF bytes in the body
+    GET  /outline?path=...   PDF under --path-root on the server's filesystem
+    GET  /health             liveness and load
+    GET  /metrics            Prometheus text format
+
+Both /outline forms accept ``first_page``/``last_page``, ``max_headings`` and
+``title_only`` query parameters (see PDFOutlineExtractor.extract_outline).
+When every worker is busy and the queue is full the service answers 429.
+
+Usage:
+    python outline_service.py --port 8080
+    python outline_service.py --unix-socket /tmp/outline.sock --workers 0
+"""
+
+import argparse
+import concurrent.futures
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from extract_outline import (PDFOutlineExtractor, LAYOUT_ENGINES, ENGINE_PDFPLUMBER, EXACT_STRATEGIES,
+                             ExtractionError)
+from outline_cache import OutlineCache
+
+logger = logging.getLogger(__name__)
+
+# Seconds a job may overrun its request timeout before its pool is recycled
+OVERDUE_GRACE_SECONDS = 5.0
+
+# Extractor of the current pool process, created once by _init_worker
+_worker_extractor: Optional[PDFOutlineExtractor] = None
+
+
+class JobTimeout(BaseException):
+    """
+    Raised inside a worker when its job outlives the request timeout; a
+    BaseException so the extractor's ``except Exception`` fallbacks let it through
+    """
+
+
+def _raise_job_timeout(signum, frame) -> None:
+    raise JobTimeout("extraction exceeded the request timeout")
+
+
+def _init_worker(extractor: PDFOutlineExtractor) -> None:
+    global _worker_extractor
+    _worker_extractor = extractor
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The parent coordinates shutdown
+    signal.signal(signal.SIGALRM, _raise_job_timeout)
+
+
+def _extract_job(pdf_path: str, options: Dict[str, Any],
+                 expires_at: Optional[float] = None) -> Tuple[Dict[str, Any], float]:
+    """
+    Pool task: extract one PDF with the warm extractor, abandoning it at
+    ``expires_at`` (wall clock) so the worker is free for the next request
+    """
+    start = time.perf_counter()
+    if expires_at is not None:
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            raise JobTimeout("request timed out while queued")
+        signal.setitimer(signal.ITIMER_REAL, remaining)
+    try:
+        result = _worker_extractor.extract_outline(pdf_path, raise_errors=True, **options)
+    finally:
+        if expires_at is not None:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return result, time.perf_counter() - start
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class ServiceMetrics:
+    """
+    Thread-safe counters exported by /metrics and /health
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.responses: Dict[int, int] = {}
+        self.in_flight = 0
+        self.extractions = 0
+        self.extraction_seconds = 0.0
+        self.cache_hits = 0
+        self.pool_restarts = 0
+
+    def record_response(self, status: int) -> None:
+        with self._lock:
+            self.responses[status] = self.responses.get(status, 0) + 1
+
+    def add_in_flight(self, delta: int) -> None:
+        with self._lock:
+            self.in_flight += delta
+
+    def record_extraction(self, seconds: float) -> None:
+        with self._lock:
+            self.extractions += 1
+            self.extraction_seconds += seconds
+
+    def record_cache_hit(self) -> None:
+        with self._lock:
+            self.cache_hits += 1
+
+    def record_pool_restart(self) -> None:
+        with self._lock:
+            self.pool_restarts += 1
+
+    def prometheus(self, workers: int, capacity: int) -> str:
+        with self._lock:
+            lines = [
+                "# TYPE outline_requests_total counter",
+                *(f'outline_requests_total{{code="{status}"}} {count}'
+                  for status, count in sorted(self.responses.items())),
+                "# TYPE outline_in_flight gauge",
+                f"outline_in_flight {self.in_flight}",
+                "# TYPE outline_capacity gauge",
+                f"outline_capacity {capacity}",
+                "# TYPE outline_workers gauge",
+                f"outline_workers {workers}",
+                "# TYPE outline_extraction_seconds summary",
+                f"outline_extraction_seconds_sum {self.extraction_seconds:.6f}",
+                f"outline_extraction_seconds_count {self.extractions}",
+                "# TYPE outline_cache_hits_total counter",
+                f"outline_cache_hits_total {self.cache_hits}",
+                "# TYPE outline_pool_restarts_total counter",
+                f"outline_pool_restarts_total {self.pool_restarts}",
+                "# TYPE outline_uptime_seconds gauge",
+                f"outline_uptime_seconds {time.time() - self.started_at:.1f}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+class OutlineService:
+    """
+    Owns the warm process pool, admission control and optional result cache.
+
+    Admission is a semaphore sized ``workers + max_queue``: a request that
+    cannot take a slot immediately is rejected instead of queueing without
+    bound. Slots are released when the extraction finishes or, after a
+    request timeout, once the overdue job has been stopped.
+    """
+
+    def __init__(self, extractor: PDFOutlineExtractor, workers: int = 1, max_queue: int = 8,
+                 request_timeout: Optional[float] = None, path_root: Optional[str] = None,
+                 max_upload_bytes: int = 100 * 1024 * 1024, cache: Optional[OutlineCache] = None):
+        self.extractor = extractor
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.capacity = self.workers + max(0, max_queue)
+        self.request_timeout = request_timeout
+        self.path_root = Path(path_root).resolve() if path_root else None
+        self.max_upload_bytes = max_upload_bytes
+        self.cache = cache
+        self.metrics = ServiceMetrics()
+
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._pool_lock = threading.Lock()
+        self._pool = self._start_pool()
+        self._recycled = weakref.WeakSet()  # Pools terminated to stop an overdue job
+
+    def _start_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        # The server is multi-threaded, so workers come from a fork server
+        # that has already imported the extractor (warm and fork-safe)
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context("forkserver")
+            ctx.set_forkserver_preload(["extract_outline"])
+        else:
+            ctx = multiprocessing.get_context("spawn")
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx,
+                                                      initializer=_init_worker, initargs=(self.extractor,))
+        return pool
+
+    def warm_up(self) -> None:
+        """Start every worker now rather than on the first requests"""
+        with self._pool_lock:
+            futures = [self._pool.submit(_ping) for _ in range(self.workers)]
+        concurrent.futures.wait(futures)
+        logger.info(f"{self.workers} extraction workers ready")
+
+    def _restart_pool(self, old: concurrent.futures.ProcessPoolExecutor, reason: str = "a worker crashed",
+                      terminate: bool = False) -> None:
+        """
+        Replace ``old`` with a fresh pool. With ``terminate`` its workers are
+        killed, failing whatever they are still running with BrokenProcessPool.
+        """
+        with self._pool_lock:
+            if self._pool is old:
+                logger.error(f"Restarting the worker pool ({reason})")
+                self._pool = self._start_pool()
+                self.metrics.record_pool_restart()
+        # ProcessPoolExecutor has no public way to stop a running task, and
+        # shutdown() forgets its processes, so collect them first
+        processes = list((old._processes or {}).values()) if terminate else []
+        if terminate:
+            self._recycled.add(old)
+        old.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    def _stop_overdue(self, future: concurrent.futures.Future, pool: concurrent.futures.ProcessPoolExecutor) -> None:
+        """
+        Stop a job whose request timed out: drop it if it has not started,
+        otherwise let the worker's own timer end it, and recycle the pool if
+        the worker is stuck where that timer cannot interrupt it (native code).
+        Other jobs lost with the recycled pool are resubmitted by extract().
+        """
+        if future.cancel():
+            return
+
+        def recycle_if_running() -> None:
+            if not future.done():
+                self._restart_pool(pool, f"a job overran --request-timeout by {OVERDUE_GRACE_SECONDS:.0f}s",
+                                   terminate=True)
+
+        timer = threading.Timer(OVERDUE_GRACE_SECONDS, recycle_if_running)
+        timer.daemon = True
+        timer.start()
+
+    def try_admit(self) -> bool:
+        if not self._slots.acquire(blocking=False):
+            return False
+        self.metrics.add_in_flight(1)
+        return True
+
+    def release(self) -> None:
+        self.metrics.add_in_flight(-1)
+        self._slots.release()
+
+    def resolve_path(self, raw_path: str) -> Path:
+        """Map a client-supplied path into --path-root, rejecting anything outside it"""
+        if self.path_root is None:
+            raise PermissionError("path requests are disabled (start the service with --path-root)")
+        path = (self.path_root / raw_path.lstrip("/")).resolve()
+        if path != self.path_root and self.path_root not in path.parents:
+            raise PermissionError(f"{raw_path} is outside the allowed root")
+        if not path.is_file():
+            raise FileNotFoundError(raw_path)
+        return path
+
+    def _submit(self, pdf_path: str, options: Dict[str, Any], expires_at: Optional[float]):
+        """Submit one job to the current pool, replacing a pool broken by an earlier crash once"""
+        for _ in range(2):
+            with self._pool_lock:
+                pool = self._pool
+                try:
+                    return pool.submit(_extract_job, pdf_path, options, expires_at), pool
+                except BrokenProcessPool:
+                    pass
+            self._restart_pool(pool)
+        raise BrokenProcessPool("worker pool could not be restarted")
+
+    def extract(self, pdf_path: str, options: Dict[str, Any], on_done) -> Dict[str, Any]:
+        """
+        Run one extraction on the pool (answering from the cache when
+        possible). ``on_done`` is called once the work is over, which may be
+        after this call timed out, or right away if no job was submitted.
+
+        A job lost because another request's overdue job forced a pool
+        recycle is resubmitted once to the new pool. Otherwise a lost job
+        raises BrokenProcessPool or CancelledError, which callers should
+        treat as retryable.
+        """
+        cache_key = None
+        future = None
+        try:
+            if self.cache is not None:
+                fingerprint = self.extractor.cache_fingerprint() + json.dumps(options, sort_keys=True)
+                cache_key = OutlineCache.make_key(pdf_path, fingerprint)
+                result = self.cache.get(cache_key)
+                if result is not None:
+                    self.metrics.record_cache_hit()
+                    return result
+
+            expires_at = time.time() + self.request_timeout if self.request_timeout else None
+            future, pool = self._submit(pdf_path, options, expires_at)
+        finally:
+            # Without a submitted job nothing else will release the slot
+            if future is None:
+                on_done()
+
+        state_lock = threading.Lock()
+        waiting = True  # While set, a lost job is this call's to resubmit or release
+
+        def lost(job: concurrent.futures.Future) -> bool:
+            return job.cancelled() or isinstance(job.exception(), BrokenProcessPool)
+
+        def finished(job: concurrent.futures.Future) -> None:
+            with state_lock:
+                if waiting and lost(job):
+                    return
+            on_done()
+
+        resubmitted = False
+        while True:
+            future.add_done_callback(finished)
+            try:
+                remaining = max(0.0, expires_at - time.time()) if expires_at is not None else None
+                result, seconds = future.result(timeout=remaining)
+                break
+            except concurrent.futures.TimeoutError:
+                with state_lock:
+                    waiting = False
+                if future.done():
+                    on_done()  # Lost just now; its callback left the release to us
+                self._stop_overdue(future, pool)
+                raise
+            except JobTimeout as e:
+                # The worker's timer fired first; the job is already over
+                raise concurrent.futures.TimeoutError(str(e)) from None
+            except ExtractionError as e:
+                # Served like any result, but a failure is never cached
+                logger.error(f"Failed to process {pdf_path}: {str(e)}")
+                return e.result
+            except (BrokenProcessPool, concurrent.futures.CancelledError):
+                if not future.cancelled():
+                    self._restart_pool(pool)
+                if not resubmitted and pool in self._recycled:
+                    resubmitted = True
+                    logger.warning(f"Resubmitting {pdf_path} after a worker pool recycle")
+                    try:
+                        future, pool = self._submit(pdf_path, options, expires_at)
+                        continue
+                    except BrokenProcessPool:
+                        pass
+                with state_lock:
+                    waiting = False
+                on_done()
+                raise
+
+        self.metrics.record_extraction(seconds)
+        strategy = result.get("metadata", {}).get("strategy")
+        if cache_key is not None and (strategy is None or strategy in EXACT_STRATEGIES):
+            try:
+                self.cache.put(cache_key, result)
+            except OSError as e:
+                logger.warning(f"Cannot cache result: {str(e)}")
+        return result
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "in_flight": self.metrics.in_flight,
+            "capacity": self.capacity,
+            "uptime_seconds": round(time.time() - self.metrics.started_at, 1)
+        }
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+def parse_options(query: Dict[str, list]) -> Dict[str, Any]:
+    """
+    extract_outline() keyword arguments from the query string (ValueError if malformed)
+    """
+    def single(name: str) -> Optional[str]:
+        values = query.get(name)
+        return values[-1] if values else None
+
+    options = {}
+    first, last = single("first_page"), single("last_page")
+    if first is not None or last is not None:
+        first_page = int(first) if first is not None else 1
+        last_page = int(last) if last is not None else 2 ** 31
+        if first_page < 1 or first_page > last_page:
+            raise ValueError("first_page must be >= 1 and <= last_page")
+        options["page_range"] = (first_page, last_page)
+
+    max_headings = single("max_headings")
+    if max_headings is not None:
+        options["max_headings"] = int(max_headings)
+        if options["max_headings"] < 0:
+            raise ValueError("max_headings must be non-negative")
+
+    if (single("title_only") or "").lower() in ("1", "true", "yes"):
+        options["title_only"] = True
+    return options
+
+
+class OutlineRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP front end; the extraction itself runs on the service's pool
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "OutlineService/1.0"
+    service: OutlineService = None  # Set on the subclass built by make_server
+
+    def log_message(self, format: str, *args) -> None:
+        # Unix-socket clients have no address; keep access logs at debug level
+        logger.debug("%s %s", self.requestline, format % args)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+        self.service.metrics.record_response(status)
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self._send(status, body, "application/json; charset=utf-8", headers)
+
+    def _send_error(self, status: int, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send_json(status, {"error": message}, headers)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            self._send_json(HTTPStatus.OK, self.service.health())
+        elif url.path == "/metrics":
+            body = self.service.metrics.prometheus(self.service.workers, self.service.capacity).encode('utf-8')
+            self._send(HTTPStatus.OK, body, "text/plain; version=0.0.4")
+        elif url.path == "/outline":
+            query = parse_qs(url.query)
+            if "path" not in query:
+                self._send_error(HTTPStatus.BAD_REQUEST, "missing 'path' query parameter")
+                return
+            try:
+                pdf_path = self.service.resolve_path(query["path"][-1])
+            except PermissionError as e:
+                self._send_error(HTTPStatus.FORBIDDEN, str(e))
+                return
+            except (FileNotFoundError, OSError):
+                self._send_error(HTTPStatus.NOT_FOUND, f"no such file: {query['path'][-1]}")
+                return
+            self._handle_outline(str(pdf_path), query)
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"unknown endpoint {url.path}")
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != "/outline":
+            self.close_connection = True
+            self._send_error(HTTPStatus.NOT_FOUND, f"unknown endpoint {url.path}")
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self.close_connection = True
+            self._send_error(HTTPStatus.LENGTH_REQUIRED, "Content-Length is required")
+            return
+        if length > self.service.max_upload_bytes:
+            self.close_connection = True  # The unread body makes the connection unusable
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                             f"upload exceeds {self.service.max_upload_bytes} bytes")
+            return
+
+        # Spool the upload so the worker reads it from disk instead of a pipe
+        fd, spool_path = tempfile.mkstemp(prefix="outline-", suffix=".pdf")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                remaining = length
+                while remaining > 0:
+                    chunk = self.rfile.read(min(remaining, 1024 * 1024))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            if remaining > 0:
+                self.close_connection = True
+                self._send_error(HTTPStatus.BAD_REQUEST, "request body shorter than Content-Length")
+                os.unlink(spool_path)
+                return
+        except BaseException:
+            os.unlink(spool_path)
+            raise
+
+        self._handle_outline(spool_path, parse_qs(url.query), cleanup=lambda: os.unlink(spool_path))
+
+    def _handle_outline(self, pdf_path: str, query: Dict[str, list], cleanup=None) -> None:
+        finished = threading.Lock()
+
+        def done() -> None:
+            # Runs once, whether the pool callback or an error path gets here first
+            if not finished.acquire(blocking=False):
+                return
+            self.service.release()
+            if cleanup is not None:
+                try:
+                    cleanup()
+                except OSError:
+                    pass
+
+        try:
+            options = parse_options(query)
+        except ValueError as e:
+            if cleanup is not None:
+                cleanup()
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+
+        if not self.service.try_admit():
+            if cleanup is not None:
+                cleanup()
+            self._send_error(HTTPStatus.TOO_MANY_REQUESTS, "all workers busy, retry later", {"Retry-After": "1"})
+            return
+
+        try:
+            result = self.service.extract(pdf_path, options, done)
+        except concurrent.futures.TimeoutError:
+            # The slot is released once the overdue job has been stopped
+            self._send_error(HTTPStatus.GATEWAY_TIMEOUT,
+                             f"extraction exceeded {self.service.request_timeout:.1f} seconds")
+            return
+        except (BrokenProcessPool, concurrent.futures.CancelledError) as e:
+            # Lost to a worker crash or pool recycle, possibly caused by another request
+            done()
+            reason = str(e) or "job cancelled by a worker pool restart"
+            self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, f"worker pool restarted, retry later: {reason}",
+                             {"Retry-After": "1"})
+            return
+        except Exception as e:
+            done()
+            logger.error(f"Failed to process {pdf_path}: {str(e)}")
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+            return
+
+        self._send_json(HTTPStatus.OK, result)
+
+
+class UnixThreadingHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self) -> None:
+        # Replace a socket left behind by an earlier run, but never a live one
+        if os.path.exists(self.server_address):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(self.server_address)
+                except OSError:
+                    os.unlink(self.server_address)
+                else:
+                    raise OSError(f"{self.server_address} is in use by another server")
+        super().server_bind()
+        self.socket_inode = os.stat(self.server_address).st_ino
+
+    def server_close(self) -> None:
+        super().server_close()
+        # Only remove the socket file if it is still ours
+        try:
+            if os.stat(self.server_address).st_ino == self.socket_inode:
+                os.unlink(self.server_address)
+        except (OSError, AttributeError):
+            pass
+
+
+def make_server(service: OutlineService, host: str = "127.0.0.1", port: int = 8080,
+                unix_socket: Optional[str] = None) -> socketserver.BaseServer:
+    """
+    HTTP server bound to TCP ``host:port`` or to ``unix_socket``
+    """
+    handler = type("BoundOutlineRequestHandler", (OutlineRequestHandler,), {"service": service})
+    if unix_socket:
+        return UnixThreadingHTTPServer(unix_socket, handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve PDF outline extraction over local HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP address to bind")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("OUTLINE_PORT", "8080")), help="TCP port")
+    parser.add_argument("--unix-socket", default=os.environ.get("OUTLINE_SOCKET"),
+                        help="Serve on this Unix socket instead of TCP")
+    parser.add_argument("--engine", choices=LAYOUT_ENGINES,
+                        default=os.environ.get("OUTLINE_ENGINE", ENGINE_PDFPLUMBER),
+                        help="Character layout engine for the font-based fallback")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("OUTLINE_WORKERS", "1")),
+                        help="Extraction processes (0 = one per CPU)")
+    parser.add_argument("--page-workers", type=int, default=int(os.environ.get("OUTLINE_PAGE_WORKERS", "1")),
+                        help="Processes for page-parallel analysis of very large documents")
+    parser.add_argument("--max-queue", type=int, default=8,
+                        help="Requests allowed to wait for a worker before answering 429")
+    parser.add_argument("--request-timeout", type=float, default=None,
+                        help="Seconds a request waits for its result before answering 504")
+    parser.add_argument("--deadline", type=float,
+                        default=float(os.environ["OUTLINE_DEADLINE"]) if os.environ.get("OUTLINE_DEADLINE") else None,
+                        help="Per-document time budget in seconds before degrading the analysis")
+    parser.add_argument("--path-root", default=None,
+                        help="Allow GET /outline?path= for PDFs under this directory")
+    parser.add_argument("--max-upload-mb", type=int, default=100, help="Largest accepted upload")
+    parser.add_argument("--cache-dir", default=os.environ.get("OUTLINE_CACHE_DIR"),
+                        help="Directory for the content-addressed result cache (disabled if unset)")
+    parser.add_argument("--cache-max-mb", type=int, default=int(os.environ.get("OUTLINE_CACHE_MAX_MB", "256")),
+                        help="Cache size limit in MB")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    extractor = PDFOutlineExtractor(engine=args.engine, page_workers=args.page_workers, deadline=args.deadline)
+    cache = OutlineCache(args.cache_dir, args.cache_max_mb * 1024 * 1024) if args.cache_dir else None
+    service = OutlineService(extractor, workers=args.workers, max_queue=args.max_queue,
+                             request_timeout=args.request_timeout, path_root=args.path_root,
+                             max_upload_bytes=args.max_upload_mb * 1024 * 1024, cache=cache)
+    service.warm_up()
+
+    server = make_server(service, args.host, args.port, args.unix_socket)
+
+    def stop(*_) -> None:
+        # shutdown() blocks until serve_forever() returns, so call it off the main thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.info(f"Serving on {args.unix_socket or f'http://{args.host}:{args.port}'}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.shutdown()  # Lets running extractions finish
+        logger.info("Service stopped")
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Watch mode: keep a warm extractor running and process PDFs as they arrive
+"""
+
+import json
+import logging
+import os
+import signal
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from extract_outline import PDFOutlineExtractor, process_files, save_result, log_cache_stats
+from outline_cache import OutlineCache
+
+try:
+    import inotify_simple  # Linux-only; polling is used when it is missing
+except ImportError:
+    inotify_simple = None
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessedState:
+    """
+    Persistent record of processed inputs (name -> size and mtime), saved
+    atomically so a restarted watcher does not redo finished files
+    """
+
+    def __init__(self, state_path: Path):
+        self.state_path = state_path
+        self.files: Dict[str, Dict[str, int]] = {}
+
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                self.files = json.load(f).get("files", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable state file {state_path}: {str(e)}")
+
+    @staticmethod
+    def signature(stat: os.stat_result) -> Dict[str, int]:
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def is_current(self, name: str, stat: os.stat_result) -> bool:
+        return self.files.get(name) == self.signature(stat)
+
+    def mark(self, name: str, stat: os.stat_result) -> None:
+        self.files[name] = self.signature(stat)
+
+    def forget_missing(self, present: set) -> None:
+        for name in list(self.files):
+            if name not in present:
+                del self.files[name]
+
+    def save(self) -> None:
+        save_result(self.state_path, {"files": self.files})
+
+
+class OutlineWatcher:
+    """
+    Long-running driver that extracts new or modified PDFs from ``input_dir``.
+
+    Uses inotify (close-after-write and move-in events) when available and
+    falls back to polling. With polling, a file is processed only once its
+    size and mtime are unchanged between two scans, so half-copied PDFs are
+    not picked up.
+
+    Only files extracted cleanly are recorded as processed. A failed file is
+    retried when it changes, after ``retry_failed_after`` seconds, or when
+    the watcher restarts.
+    """
+
+    STATE_NAME = ".outline_state.json"
+
+    def __init__(self, input_dir: str, output_dir: str, extractor: PDFOutlineExtractor,
+                 workers: int = 1, timeout: Optional[float] = None, cache: Optional[OutlineCache] = None,
+                 poll_interval: float = 2.0, state_path: Optional[str] = None, retry_failed_after: float = 300.0):
+        self.input_dir = Path(input_dir)
+        self.output_dir = Path(output_dir)
+        self.extractor = extractor
+        self.workers = workers
+        self.timeout = timeout
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.retry_failed_after = retry_failed_after
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.state = ProcessedState(Path(state_path) if state_path else self.output_dir / self.STATE_NAME)
+
+        self._pending: Dict[str, Dict[str, int]] = {}  # Polling: name -> last seen signature
+        self._failed: Dict[str, Tuple[Dict[str, int], float]] = {}  # Name -> (signature, retry at)
+        self._stopping = False
+
+    def stop(self, *_) -> None:
+        """Finish the current batch and exit the watch loop"""
+        logger.info("Stopping watcher")
+        self._stopping = True
+
+    def _changed_files(self, settle: bool, names: Optional[set] = None) -> List[Path]:
+        """
+        PDFs whose size/mtime differ from the processed state. With ``settle``
+        a file must also look the same as on the previous scan; ``names``
+        restricts the result to files reported by inotify.
+        """
+        changed = []
+        present = set()
+
+        for pdf_file in sorted(self.input_dir.glob("*.pdf")):
+            try:
+                stat = pdf_file.stat()
+            except OSError:
+                continue  # Deleted between glob and stat
+            present.add(pdf_file.name)
+
+            if names is not None and pdf_file.name not in names:
+                continue
+
+            if self.state.is_current(pdf_file.name, stat):
+                self._pending.pop(pdf_file.name, None)
+                continue
+
+            signature = ProcessedState.signature(stat)
+            failed = self._failed.get(pdf_file.name)
+            if failed is not None and failed[0] == signature and time.monotonic() < failed[1]:
+                continue  # Failed recently and unchanged since
+            if settle and self._pending.get(pdf_file.name) != signature:
+                self._pending[pdf_file.name] = signature  # Check again next scan
+                continue
+
+            self._pending.pop(pdf_file.name, None)
+            changed.append(pdf_file)
+
+        self.state.forget_missing(present)
+        for name in list(self._failed):
+            if name not in present:
+                del self._failed[name]
+        return changed
+
+    def process_batch(self, pdf_files: List[Path]) -> None:
+        """Extract a batch and record the files extracted cleanly in the persistent state"""
+        if not pdf_files:
+            return
+
+        # Capture signatures before extracting so a rewrite during processing
+        # is seen as a new change
+        stats = {}
+        for pdf_file in pdf_files:
+            try:
+                stats[pdf_file] = pdf_file.stat()
+            except OSError:
+                pass
+        pdf_files = [pdf_file for pdf_file in pdf_files if pdf_file in stats]
+
+        logger.info(f"Processing {len(pdf_files)} new or modified PDF(s)")
+        succeeded = process_files(pdf_files, self.output_dir, self.extractor, self.workers, self.timeout, self.cache)
+
+        for pdf_file in pdf_files:
+            if succeeded.get(pdf_file):
+                self.state.mark(pdf_file.name, stats[pdf_file])
+                self._failed.pop(pdf_file.name, None)
+            else:
+                # Kept in memory only, so a restart retries it
+                signature = ProcessedState.signature(stats[pdf_file])
+                self._failed[pdf_file.name] = (signature, time.monotonic() + self.retry_failed_after)
+        self.state.save()
+
+    def run(self) -> None:
+        """Process the backlog, then block and handle files as they arrive"""
+        if not self.input_dir.exists():
+            logger.error(f"Input directory {self.input_dir} does not exist")
+            return
+
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        inotify = None
+        if inotify_simple is not None:
+            try:
+                inotify = inotify_simple.INotify()
+                flags = inotify_simple.flags
+                inotify.add_watch(str(self.input_dir), flags.CLOSE_WRITE | flags.MOVED_TO | flags.DELETE)
+            except OSError as e:
+                logger.warning(f"inotify unavailable ({str(e)}), falling back to polling")
+                if inotify is not None:
+                    inotify.close()
+                inotify = None
+
+        try:
+            # The watch exists before the backlog is scanned, so files arriving
+            # meanwhile still raise events. Files already present at startup
+            # are complete; no need to settle them.
+            self.process_batch(self._changed_files(settle=False))
+
+            if inotify is None:
+                self._run_polling()
+            else:
+                self._run_inotify(inotify)
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def _run_polling(self) -> None:
+        logger.info(f"Polling {self.input_dir} every {self.poll_interval:.1f}s")
+        while not self._stopping:
+            time.sleep(self.poll_interval)
+            self.process_batch(self._changed_files(settle=True))
+
+    def _run_inotify(self, inotify) -> None:
+        logger.info(f"Watching {self.input_dir} with inotify")
+
+        while not self._stopping:
+            # Wake up periodically so a stop request is honoured promptly
+            events = inotify.read(timeout=int(self.poll_interval * 1000), read_delay=100)
+            names = {event.name for event in events if event.name.lower().endswith(".pdf")}
+            if names:
+                # Only files that were closed after writing or moved in are complete
+                self.process_batch(self._changed_files(settle=False, names=names))
+
+
+def watch_pdfs(engine: str, workers: int, timeout: Optional[float], input_dir: str, output_dir: str,
+               page_workers: int = 1, cache_dir: Optional[str] = None,
+               cache_max_bytes: int = 256 * 1024 * 1024, poll_interval: float = 2.0,
+               profile_report: bool = False, profiler: Optional[str] = None,
+               deadline: Optional[float] = None) -> None:
+    """
+    Entry point for ``extract_outline.py --watch``
+    """
+    extractor = PDFOutlineExtractor(engine=engine, page_workers=page_workers,
+                                    profile_report=profile_report, profiler=profiler, deadline=deadline)
+    cache = OutlineCache(cache_dir, cache_max_bytes) if cache_dir else None
+
+    watcher = OutlineWatcher(input_dir, output_dir, extractor, workers=workers, timeout=timeout,
+                             cache=cache, poll_interval=poll_interval)
+    try:
+        watcher.run()
+    finally:
+        log_cache_stats(cache)
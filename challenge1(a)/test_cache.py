@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Check that the result cache answers unchanged files, is keyed by content and
+settings, and never stores failed extractions
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from extract_outline import PDFOutlineExtractor, ENGINE_PYMUPDF, process_files
+from outline_cache import OutlineCache
+
+INPUT_DIR = Path(__file__).resolve().parent / "input"
+
+
+class OutlineCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.work_dir)
+        self.input_dir = self.work_dir / "input"
+        self.output_dir = self.work_dir / "output"
+        self.input_dir.mkdir()
+        self.output_dir.mkdir()
+        self.cache = OutlineCache(str(self.work_dir / "cache"))
+
+    def copy_input(self, name: str) -> Path:
+        return Path(shutil.copy(INPUT_DIR / name, self.input_dir))
+
+    def test_unchanged_file_is_served_from_cache(self):
+        pdf_file = self.copy_input("file02.pdf")
+        extractor = PDFOutlineExtractor()
+
+        self.assertEqual({pdf_file: True}, process_files([pdf_file], self.output_dir, extractor, cache=self.cache))
+        expected = (self.output_dir / "file02.json").read_text(encoding="utf-8")
+        (self.output_dir / "file02.json").unlink()
+
+        self.assertEqual({pdf_file: True}, process_files([pdf_file], self.output_dir, extractor, cache=self.cache))
+        self.assertEqual(expected, (self.output_dir / "file02.json").read_text(encoding="utf-8"))
+        self.assertEqual(1, self.cache.stats()["hits"])
+        self.assertEqual(1, self.cache.stats()["stores"])
+
+    def test_failed_extraction_is_not_cached(self):
+        pdf_file = self.input_dir / "broken.pdf"
+        pdf_file.write_bytes(b"%PDF-1.4 garbage")
+        extractor = PDFOutlineExtractor()
+
+        for _ in range(2):
+            self.assertEqual({pdf_file: False}, process_files([pdf_file], self.output_dir, extractor, cache=self.cache))
+            with open(self.output_dir / "broken.json", encoding="utf-8") as f:
+                self.assertEqual({"title": "", "outline": []}, json.load(f))
+
+        self.assertEqual({"hits": 0, "misses": 2, "stores": 0, "evictions": 0}, self.cache.stats())
+
+    def test_key_changes_with_content(self):
+        pdf_file = self.copy_input("file01.pdf")
+        fingerprint = PDFOutlineExtractor().cache_fingerprint()
+        key = OutlineCache.make_key(str(pdf_file), fingerprint)
+
+        self.assertEqual(key, OutlineCache.make_key(str(pdf_file), fingerprint))
+        with open(pdf_file, "ab") as f:
+            f.write(b"\n% appended\n")
+        self.assertNotEqual(key, OutlineCache.make_key(str(pdf_file), fingerprint))
+
+    def test_key_changes_with_extractor_settings(self):
+        pdf_file = self.copy_input("file01.pdf")
+        default = PDFOutlineExtractor()
+        key = OutlineCache.make_key(str(pdf_file), default.cache_fingerprint())
+
+        # Parallelism does not change results, so it shares entries
+        parallel = PDFOutlineExtractor(page_workers=4)
+        self.assertEqual(key, OutlineCache.make_key(str(pdf_file), parallel.cache_fingerprint()))
+
+        threshold = PDFOutlineExtractor()
+        threshold.font_size_threshold = 1.0
+        for extractor in (PDFOutlineExtractor(engine=ENGINE_PYMUPDF), PDFOutlineExtractor(deadline=5.0), threshold):
+            with self.subTest(fingerprint=extractor.cache_fingerprint()):
+                self.assertNotEqual(key, OutlineCache.make_key(str(pdf_file), extractor.cache_fingerprint()))
+
+
+if __name__ == "__main__":
+    unittest.main()
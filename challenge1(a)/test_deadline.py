@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Check the strategies recorded under a per-document deadline and that degraded
+results are never cached
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from extract_outline import (PDFOutlineExtractor, EXACT_STRATEGIES, STRATEGY_EMBEDDED, STRATEGY_FULL,
+                             process_files)
+from outline_cache import OutlineCache
+
+INPUT_DIR = Path(__file__).resolve().parent / "input"
+BOOKMARKED_PDF = INPUT_DIR / "file04.pdf"  # Has an embedded outline
+UNMARKED_PDF = INPUT_DIR / "file02.pdf"    # Needs font-based analysis of 12 pages
+
+
+class DeadlineTest(unittest.TestCase):
+
+    def test_no_deadline_adds_no_metadata(self):
+        self.assertNotIn("metadata", PDFOutlineExtractor().extract_outline(str(UNMARKED_PDF)))
+
+    def test_generous_deadline_matches_full_run(self):
+        expected = PDFOutlineExtractor().extract_outline(str(UNMARKED_PDF))
+        result = PDFOutlineExtractor(deadline=600.0).extract_outline(str(UNMARKED_PDF))
+
+        metadata = result.pop("metadata")
+        self.assertEqual(expected, result)
+        self.assertEqual(STRATEGY_FULL, metadata["strategy"])
+        self.assertEqual(12, metadata["page_count"])
+        self.assertEqual(12, metadata["pages_analyzed"])
+        self.assertEqual(600.0, metadata["deadline_seconds"])
+
+    def test_expired_deadline_degrades(self):
+        expected = PDFOutlineExtractor().extract_outline(str(UNMARKED_PDF))
+        result = PDFOutlineExtractor(deadline=0.0).extract_outline(str(UNMARKED_PDF))
+
+        self.assertNotIn(result["metadata"]["strategy"], EXACT_STRATEGIES)
+        self.assertLess(result["metadata"]["pages_analyzed"], result["metadata"]["page_count"])
+        self.assertEqual(expected["title"], result["title"])
+
+    def test_embedded_outline_ignores_deadline(self):
+        expected = PDFOutlineExtractor().extract_outline(str(BOOKMARKED_PDF))
+        result = PDFOutlineExtractor(deadline=0.0).extract_outline(str(BOOKMARKED_PDF))
+
+        self.assertEqual(STRATEGY_EMBEDDED, result.pop("metadata")["strategy"])
+        self.assertEqual(expected, result)
+
+    def test_degraded_result_is_not_cached(self):
+        work_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, work_dir)
+        cache = OutlineCache(str(work_dir / "cache"))
+        pdf_files = [UNMARKED_PDF, BOOKMARKED_PDF]
+
+        succeeded = process_files(pdf_files, work_dir, PDFOutlineExtractor(deadline=0.0), cache=cache)
+
+        # Degraded output is still a clean extraction, just not a reusable one
+        self.assertEqual({pdf_file: True for pdf_file in pdf_files}, succeeded)
+        self.assertEqual(1, cache.stats()["stores"])
+        process_files(pdf_files, work_dir, PDFOutlineExtractor(deadline=0.0), cache=cache)
+        self.assertEqual(1, cache.stats()["hits"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Check that both layout engines produce the same JSON for every sample input
+"""
+import json
+import os
+import sys
+import unittest
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from extract_outline import PDFOutlineExtractor, ENGINE_PDFPLUMBER, ENGINE_PYMUPDF
+
+INPUT_DIR = Path(__file__).resolve().parent / "input"
+
+
+class EngineParityTest(unittest.TestCase):
+
+    def test_engines_match_on_inputs(self):
+        pdf_files = sorted(INPUT_DIR.glob("*.pdf"))
+        self.assertTrue(pdf_files, f"No sample PDFs in {INPUT_DIR}")
+
+        plumber = PDFOutlineExtractor(engine=ENGINE_PDFPLUMBER)
+        mupdf = PDFOutlineExtractor(engine=ENGINE_PYMUPDF)
+        for pdf_file in pdf_files:
+            with self.subTest(pdf=pdf_file.name):
+                expected = json.dumps(plumber.extract_outline(str(pdf_file)), indent=2, ensure_ascii=False)
+                actual = json.dumps(mupdf.extract_outline(str(pdf_file)), indent=2, ensure_ascii=False)
+                self.assertEqual(expected, actual)
+
+
+if __name__ == "__main__":
+    unittest.main()
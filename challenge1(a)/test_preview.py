@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Check that the preview options give the title and the part of the outline a
+full run would
+"""
+import os
+import sys
+import unittest
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from extract_outline import PDFOutlineExtractor
+
+INPUT_DIR = Path(__file__).resolve().parent / "input"
+
+
+class PreviewTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.extractor = PDFOutlineExtractor()
+        cls.pdf_files = sorted(INPUT_DIR.glob("*.pdf"))
+        cls.full = {pdf_file: cls.extractor.extract_outline(str(pdf_file)) for pdf_file in cls.pdf_files}
+
+    def test_title_only(self):
+        for pdf_file in self.pdf_files:
+            with self.subTest(pdf=pdf_file.name):
+                expected = {"title": self.full[pdf_file]["title"], "outline": []}
+                self.assertEqual(expected, self.extractor.extract_outline(str(pdf_file), title_only=True))
+
+    def test_page_range(self):
+        # Font statistics come from the range alone, so only headings in range are guaranteed
+        for pdf_file in self.pdf_files:
+            for page_range in ((1, 1), (2, 3), (5, 100)):
+                with self.subTest(pdf=pdf_file.name, page_range=page_range):
+                    first, last = page_range
+                    result = self.extractor.extract_outline(str(pdf_file), page_range=page_range)
+                    self.assertEqual(self.full[pdf_file]["title"], result["title"])
+                    self.assertTrue(all(first <= item["page"] <= last for item in result["outline"]))
+
+    def test_page_range_covering_document(self):
+        for pdf_file in self.pdf_files:
+            with self.subTest(pdf=pdf_file.name):
+                self.assertEqual(self.full[pdf_file], self.extractor.extract_outline(str(pdf_file), page_range=(1, 1000)))
+
+    def test_max_headings(self):
+        for pdf_file in self.pdf_files:
+            for max_headings in (0, 1, 3):
+                with self.subTest(pdf=pdf_file.name, max_headings=max_headings):
+                    result = self.extractor.extract_outline(str(pdf_file), max_headings=max_headings)
+                    self.assertEqual(self.full[pdf_file]["title"], result["title"])
+                    self.assertEqual(self.full[pdf_file]["outline"][:max_headings], result["outline"])
+
+    def test_invalid_arguments(self):
+        pdf_file = str(self.pdf_files[0])
+        with self.assertRaises(ValueError):
+            self.extractor.extract_outline(pdf_file, max_headings=-1)
+        with self.assertRaises(ValueError):
+            self.extractor.extract_outline(pdf_file, page_range=(3, 2))
+        with self.assertRaises(ValueError):
+            self.extractor.extract_outline(pdf_file, page_range=(1, 2, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Check which files the watcher picks up, records as processed and retries
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from extract_outline import PDFOutlineExtractor
+from outline_watch import OutlineWatcher
+
+INPUT_DIR = Path(__file__).resolve().parent / "input"
+
+
+class OutlineWatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        work_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, work_dir)
+        self.input_dir = work_dir / "input"
+        self.output_dir = work_dir / "output"
+        self.input_dir.mkdir()
+        shutil.copy(INPUT_DIR / "file01.pdf", self.input_dir)
+        (self.input_dir / "broken.pdf").write_bytes(b"%PDF-1.4 garbage")
+
+    def make_watcher(self, **kwargs) -> OutlineWatcher:
+        return OutlineWatcher(str(self.input_dir), str(self.output_dir), PDFOutlineExtractor(), **kwargs)
+
+    def names(self, pdf_files):
+        return [pdf_file.name for pdf_file in pdf_files]
+
+    def test_only_clean_files_are_recorded(self):
+        watcher = self.make_watcher()
+        watcher.process_batch(watcher._changed_files(settle=False))
+
+        self.assertTrue((self.output_dir / "file01.json").exists())
+        self.assertTrue((self.output_dir / "broken.json").exists())
+        with open(self.output_dir / OutlineWatcher.STATE_NAME, encoding="utf-8") as f:
+            self.assertEqual(["file01.pdf"], sorted(json.load(f)["files"]))
+
+    def test_restart_skips_processed_and_retries_failed(self):
+        watcher = self.make_watcher()
+        watcher.process_batch(watcher._changed_files(settle=False))
+
+        self.assertEqual(["broken.pdf"], self.names(self.make_watcher()._changed_files(settle=False)))
+
+    def test_failed_file_waits_for_retry_or_change(self):
+        watcher = self.make_watcher(retry_failed_after=3600.0)
+        watcher.process_batch(watcher._changed_files(settle=False))
+        self.assertEqual([], watcher._changed_files(settle=False))
+
+        (self.input_dir / "broken.pdf").write_bytes(b"%PDF-1.4 still garbage")
+        self.assertEqual(["broken.pdf"], self.names(watcher._changed_files(settle=False)))
+
+        watcher = self.make_watcher(retry_failed_after=0.0)
+        watcher.process_batch(watcher._changed_files(settle=False))
+        self.assertEqual(["broken.pdf"], self.names(watcher._changed_files(settle=False)))
+
+    def test_polling_waits_for_file_to_settle(self):
+        watcher = self.make_watcher()
+        self.assertEqual([], watcher._changed_files(settle=True))
+        self.assertEqual(["broken.pdf", "file01.pdf"], self.names(watcher._changed_files(settle=True)))
+
+    def test_deleted_files_are_forgotten(self):
+        watcher = self.make_watcher()
+        watcher.process_batch(watcher._changed_files(settle=False))
+        (self.input_dir / "file01.pdf").unlink()
+        watcher._changed_files(settle=False)
+
+        self.assertEqual({}, watcher.state.files)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+from src.parser import extract_text_sections
+from src.ranker import embed_texts, get_embedding
+from src.embedding_cache import EmbeddingCache
+from src.vector_index import VectorIndex
+
+import argparse
+import json
+import os
+import time
+
+INDEX_DIR = os.environ.get("SECTION_INDEX", os.path.join(os.getcwd(), "index"))
+EMBEDDING_CACHE = os.environ.get("EMBEDDING_CACHE", os.path.join(os.getcwd(), "cache", "embeddings.sqlite"))
+
+def file_signature(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+def build(index, input_dir, cache):
+    """Index new or modified PDFs and drop documents that were deleted from input_dir"""
+    files = sorted(f for f in os.listdir(input_dir) if f.endswith(".pdf"))
+    indexed = index.documents()
+
+    for file in files:
+        full_path = os.path.join(input_dir, file)
+        signature = file_signature(full_path)
+        if indexed.get(file) == signature:
+            continue
+        print(f"Indexing {file}...")
+        sections = extract_text_sections(full_path)
+        vectors = embed_texts([section["text"] for section in sections], cache=cache)
+        index.add_document(file, sections, vectors, signature)
+
+    for file in set(indexed) - set(files):
+        print(f"Removing {file}...")
+        index.remove_document(file)
+
+def query(index, persona, job_to_be_done, top_k, n_probe):
+    start = time.perf_counter()
+    query_vec = get_embedding(f"{persona}. {job_to_be_done}")
+    embedded = time.perf_counter()
+    results = index.search(query_vec, top_k, n_probe=n_probe)
+    searched = time.perf_counter()
+
+    print(json.dumps([{
+        "document": r["document"],
+        "page_number": r["page"],
+        "section_title": r["title"],
+        "importance_rank": i + 1,
+        "score": round(r["score"], 6)
+    } for i, r in enumerate(results)], indent=2))
+    print(f"Query embedding {1000 * (embedded - start):.1f} ms, search {1000 * (searched - embedded):.1f} ms "
+          f"over {len(index)} sections")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Maintain a persistent section index and query it by persona")
+    parser.add_argument("--index", default=INDEX_DIR, help="Index directory (default: $SECTION_INDEX or ./index)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = commands.add_parser("build", help="Add new/modified PDFs and drop deleted ones")
+    build_cmd.add_argument("--input", default=os.path.join(os.getcwd(), "input"), help="Directory of PDFs")
+    build_cmd.add_argument("--no-cache", action="store_true", help="Do not use the embedding cache")
+
+    query_cmd = commands.add_parser("query", help="Rank indexed sections for a persona and job")
+    query_cmd.add_argument("--persona-task", default="persona_task.json", help="JSON file with persona and job_to_be_done")
+    query_cmd.add_argument("--top-k", type=int, default=5)
+    query_cmd.add_argument("--n-probe", type=int, default=None,
+                           help="Approximate search over this many IVF lists (needs 'train')")
+
+    remove_cmd = commands.add_parser("remove", help="Remove documents from the index")
+    remove_cmd.add_argument("documents", nargs="+")
+
+    train_cmd = commands.add_parser("train", help="Build IVF lists for approximate search")
+    train_cmd.add_argument("--lists", type=int, default=None, help="Number of lists (default: sqrt of sections)")
+
+    commands.add_parser("compact", help="Reclaim space from removed documents")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    index = VectorIndex(args.index)
+    try:
+        if args.command == "build":
+            cache = None if args.no_cache or not EMBEDDING_CACHE else EmbeddingCache(EMBEDDING_CACHE)
+            build(index, args.input, cache)
+            print(f"Index holds {len(index)} sections from {len(index.documents())} documents")
+        elif args.command == "query":
+            with open(args.persona_task, "r") as f:
+                task_info = json.load(f)
+            query(index, task_info["persona"], task_info["job_to_be_done"], args.top_k, args.n_probe)
+        elif args.command == "remove":
+            for document in args.documents:
+                print(f"Removed {index.remove_document(document)} sections of {document}")
+        elif args.command == "train":
+            index.train_ivf(args.lists)
+        elif args.command == "compact":
+            index.compact()
+    finally:
+        index.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,181 @@
-from src.parser import extract_text_sections
-from src.ranker import rank_sections
-from src.summarizer import summarize
+import time
 
+_import_start = time.perf_counter()
+
+from src.pipeline import parse_and_embed, parse_documents, PARSE_WORKERS
+from src.lexical import prefilter, rankable_sections, recall_at_k, DEFAULT_PREFILTER_SIZE
+from src.ranker import embed_texts, top_k_per_query, BACKENDS, ENCODER_BACKEND
+from src.summarizer import summarize_batch
+from src.embedding_cache import EmbeddingCache
+from src import models
+
+import argparse
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+IMPORT_SECONDS = time.perf_counter() - _import_start
+
 INPUT_DIR = os.path.join(os.getcwd(), "input")
 OUTPUT_DIR = os.path.join(os.getcwd(), "output")
+# Section embeddings are reused across runs; set EMBEDDING_CACHE="" to disable
+EMBEDDING_CACHE = os.environ.get("EMBEDDING_CACHE", os.path.join(os.getcwd(), "cache", "embeddings.sqlite"))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+# BM25 candidates per task passed to the encoder; 0 (the default) embeds every section
+PREFILTER_SIZE = int(os.environ.get("PREFILTER_SIZE", "0"))
+
+def load_task(path):
+    """Load persona and job from a JSON file"""
+    with open(path, "r") as f:
+        task_info = json.load(f)
+    return {"persona": task_info["persona"], "job_to_be_done": task_info["job_to_be_done"], "output": "output.json"}
+
+def load_tasks(path):
+    """
+    Load a JSON list of {"persona", "job_to_be_done"[, "output"]} tasks;
+    outputs default to output_<n>.json
+    """
+    with open(path, "r") as f:
+        task_list = json.load(f)
+    tasks = []
+    for n, task_info in enumerate(task_list, start=1):
+        tasks.append({
+            "persona": task_info["persona"],
+            "job_to_be_done": task_info["job_to_be_done"],
+            "output": task_info.get("output") or f"output_{n}.json"
+        })
+    if len({task["output"] for task in tasks}) != len(tasks):
+        raise ValueError(f"Tasks in {path} must have distinct output names")
+    return tasks
+
+def print_timings(timings):
+    timings = dict(timings, **{f"load {name}": seconds for name, seconds in models.load_times().items()})
+    print("\nTiming breakdown:")
+    for stage, seconds in timings.items():
+        print(f"  {stage:<18} {seconds:8.3f}s")
+
+def main(args):
+    timings = {"imports": IMPORT_SECONDS}
+
+    start = time.perf_counter()
+    tasks = load_tasks(args.tasks) if args.tasks else [load_task(args.persona_task)]
+    timings["task"] = time.perf_counter() - start
 
+    # The summarizer loads in the background while PDFs are parsed and embedded
+    warm_up = [models.SUMMARIZER]
+    if args.warm_up:
+        warm_up.append(models.ONNX_ENCODER if args.backend == "onnx" else models.ENCODER)
+    models.warm_up(*warm_up, background=True)
 
-# Load persona and job dynamically from JSON file
-with open("persona_task.json", "r") as f:
-    task_info = json.load(f)
-    persona = task_info["persona"]
-    job = task_info["job_to_be_done"]
+    files = [f for f in os.listdir(args.input) if f.endswith(".pdf")]
 
-def main():
-    files = [f for f in os.listdir(INPUT_DIR) if f.endswith(".pdf")]
-    all_sections = []
+    queries = [f"{task['persona']}. {task['job_to_be_done']}" for task in tasks]
 
-    for file in files:
-        full_path = os.path.join(INPUT_DIR, file)
-        print(f"Processing {file}...")
-        sections = extract_text_sections(full_path)
-        for section in sections:
-            section["document"] = file
-        all_sections.extend(sections)
+    # The collection is parsed and embedded once, whatever the number of tasks
+    start = time.perf_counter()
+    cache = EmbeddingCache(EMBEDDING_CACHE, EMBEDDING_CACHE_MAX_ENTRIES) if EMBEDDING_CACHE else None
+    try:
+        rows = candidate_rows = None
+        if args.prefilter:
+            # BM25 first stage: only the union of every task's top-M candidates is embedded
+            all_sections = parse_documents(args.input, files, workers=args.workers)
+            candidates = prefilter(all_sections, queries, args.prefilter, dedup=args.dedup) if all_sections else []
+            rows = sorted({int(i) for task_candidates in candidates for i in task_candidates})
+            section_vecs = embed_texts([all_sections[i]["text"] for i in rows], cache=cache, backend=args.backend)
+            row_of = {i: row for row, i in enumerate(rows)}
+            candidate_rows = [[row_of[int(i)] for i in task_candidates] for task_candidates in candidates]
+            print(f"Prefilter: embedding {len(rows)} of {len(all_sections)} sections")
+        else:
+            all_sections, section_vecs = parse_and_embed(args.input, files, workers=args.workers,
+                                                         cache=cache, backend=args.backend)
+            if args.dedup:
+                candidate_rows = [rankable_sections(all_sections)] * len(tasks)
+        timings["parse + embed"] = time.perf_counter() - start
 
-    top_sections = rank_sections(all_sections, persona, job)
+        # All queries in one batch, all tasks scored with one matrix product
+        start = time.perf_counter()
+        selections = [[] for _ in tasks]
+        if all_sections:
+            query_vecs = embed_texts(queries, backend=args.backend)
+            ranked = top_k_per_query(section_vecs, query_vecs, args.top_k, candidate_rows)
+            selections = [[rows[row] for row in top] if rows is not None else top.tolist() for top, _ in ranked]
+        timings["rank"] = time.perf_counter() - start
 
-    subsection_analysis = []
-    for s in top_sections:
-        summary = summarize(s["text"])
-        summary["document"] = s["document"]
-        summary["page_number"] = s["page"]
-        subsection_analysis.append(summary)
+        if args.prefilter and args.recall_report and all_sections:
+            write_recall_report(args, tasks, all_sections, selections, query_vecs, cache, len(rows))
+    finally:
+        if cache is not None:
+            print(f"Embedding cache: {cache.hits} hits, {cache.misses} misses")
+            cache.close()
+
+    # Summaries are generated task by task in the background; each output is
+    # written as soon as its own sections are summarized, while the next
+    # task's are generated. A section selected by several tasks is summarized once.
+    start = time.perf_counter()
+    batches = []
+    seen = set()
+    for top in selections:
+        batches.append([i for i in dict.fromkeys(top) if i not in seen])
+        seen.update(batches[-1])
+
+    os.makedirs(args.output, exist_ok=True)
+    summary_of = {}
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        futures = [executor.submit(summarize_batch, [all_sections[i]["text"] for i in new]) for new in batches]
+        for task, top, new, summaries in zip(tasks, selections, batches, futures):
+            summary_of.update(zip(new, summaries.result()))
+            output = build_output(files, task, [all_sections[i] for i in top])
+            output["subsection_analysis"] = [{
+                "refined_text": summary_of[i]["refined_text"],
+                "document": all_sections[i]["document"],
+                "page_number": all_sections[i]["page"]
+            } for i in top]
+
+            output_path = os.path.join(args.output, task["output"])
+            with open(output_path, "w") as f:
+                json.dump(output, f, indent=2)
+            print(f"\n✅ Output written to {output_path}")
+    timings["summarize + write"] = time.perf_counter() - start
+
+    if args.timings:
+        # Model load time is also contained in the embed/summarize stages
+        print_timings(timings)
+
+def write_recall_report(args, tasks, all_sections, selections, query_vecs, cache, embedded):
+    """
+    Compare prefiltered rankings with a full neural ranking of every section
+    (of every rankable section with --dedup, as the prefilter saw them)
+    """
+    full_vecs = embed_texts([section["text"] for section in all_sections], cache=cache, backend=args.backend)
+    reference_rows = [rankable_sections(all_sections)] * len(tasks) if args.dedup else None
+    full = top_k_per_query(full_vecs, query_vecs, args.top_k, reference_rows)
+    per_task = [{
+        "output": task["output"],
+        "recall_at_k": recall_at_k(reference.tolist(), top)
+    } for task, top, (reference, _) in zip(tasks, selections, full)]
+
+    report = {
+        "prefilter": args.prefilter,
+        "dedup": args.dedup,
+        "top_k": args.top_k,
+        "sections": len(all_sections),
+        "embedded": embedded,
+        "mean_recall_at_k": sum(task["recall_at_k"] for task in per_task) / len(per_task),
+        "tasks": per_task
+    }
+    os.makedirs(args.output, exist_ok=True)
+    report_path = os.path.join(args.output, "recall_report.json")
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Prefilter recall@{args.top_k}: {report['mean_recall_at_k']:.3f} (report: {report_path})")
 
-    output = {
+def build_output(files, task, top_sections):
+    return {
         "metadata": {
             "documents": files,
-            "persona": persona,
-            "job_to_be_done": job,
+            "persona": task["persona"],
+            "job_to_be_done": task["job_to_be_done"],
             "timestamp": datetime.now().isoformat()
         },
         "extracted_sections": [{
@@ -50,14 +184,30 @@ def main():
             "section_title": s["title"],
             "importance_rank": i + 1
         } for i, s in enumerate(top_sections)],
-        "subsection_analysis": subsection_analysis
+        "subsection_analysis": []
     }
 
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    output_path = os.path.join(OUTPUT_DIR, "output.json")
-    with open(output_path, "w") as f:
-        json.dump(output, f, indent=2)
-    print(f"\n✅ Output written to {output_path}")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Rank and summarize PDF sections for a persona and job")
+    parser.add_argument("--input", default=INPUT_DIR, help="Directory of PDFs (default: ./input)")
+    parser.add_argument("--output", default=OUTPUT_DIR, help="Output directory (default: ./output)")
+    parser.add_argument("--persona-task", default="persona_task.json", help="JSON file with persona and job_to_be_done")
+    parser.add_argument("--tasks", default=None,
+                        help="Batch mode: JSON list of persona tasks, one output file each (overrides --persona-task)")
+    parser.add_argument("--top-k", type=int, default=5, help="Number of sections to extract")
+    parser.add_argument("--prefilter", type=int, nargs="?", const=DEFAULT_PREFILTER_SIZE, default=PREFILTER_SIZE or None,
+                        metavar="M", help=f"Embed only the top M BM25 candidates per task, {DEFAULT_PREFILTER_SIZE} if "
+                                          "M is omitted (default: $PREFILTER_SIZE, off when unset)")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Rank only the first copy of repeated (title, text) sections and skip empty ones")
+    parser.add_argument("--recall-report", action="store_true",
+                        help="With --prefilter, also rank every section and write recall@k to recall_report.json")
+    parser.add_argument("--workers", type=int, default=PARSE_WORKERS, help="PDF parser processes (default: CPU count)")
+    parser.add_argument("--backend", choices=BACKENDS, default=ENCODER_BACKEND,
+                        help="Section encoder: eager PyTorch or int8 ONNX Runtime (default: $ENCODER_BACKEND or torch)")
+    parser.add_argument("--warm-up", action="store_true", help="Also load the encoder in the background while parsing")
+    parser.add_argument("--timings", action="store_true", help="Print a per-stage timing breakdown")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    main()
+    main(parse_args())
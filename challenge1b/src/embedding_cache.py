@@ -0,0 +1,103 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+# SQLite caps the number of bound parameters per statement
+LOOKUP_CHUNK = 500
+
+class EmbeddingCache:
+    """
+    Disk-backed store of float32 embeddings keyed by model name and text hash.
+
+    Entries carry a last-used timestamp; once the cache holds more than
+    ``max_entries`` vectors the least recently used ones are evicted.
+    """
+
+    def __init__(self, path, max_entries=200_000):
+        self.path = path
+        self.max_entries = max_entries
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " dim INTEGER NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self.conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_name, text):
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{model_name}:{digest}"
+
+    def get_many(self, model_name, texts):
+        """Return {position: vector} for the texts already in the cache"""
+        keys = [self.make_key(model_name, text) for text in texts]
+        positions = {}
+        for i, key in enumerate(keys):
+            positions.setdefault(key, []).append(i)
+
+        found = {}
+        unique_keys = list(positions)
+        for start in range(0, len(unique_keys), LOOKUP_CHUNK):
+            chunk = unique_keys[start:start + LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            for key, blob in rows:
+                vector = np.frombuffer(blob, dtype=np.float32)
+                for i in positions[key]:
+                    found[i] = vector
+
+        if found:
+            now = time.time()
+            hit_keys = {keys[i] for i in found}
+            self.conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                  [(now, key) for key in hit_keys])
+            self.conn.commit()
+
+        self.hits += len(found)
+        self.misses += len(texts) - len(found)
+        return found
+
+    def put_many(self, model_name, texts, vectors):
+        """Store one float32 row per text, then evict down to ``max_entries``"""
+        if not len(texts):
+            return
+        now = time.time()
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, dim, vector, last_used) VALUES (?, ?, ?, ?)",
+            [(self.make_key(model_name, text), vector.shape[0], vector.tobytes(), now)
+             for text, vector in zip(texts, vectors)]
+        )
+        self.conn.commit()
+        self.evict()
+
+    def evict(self):
+        count = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)", (excess,)
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
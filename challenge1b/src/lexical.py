@@ -0,0 +1,86 @@
+import math
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from src.ranker import top_k_indices
+
+# Candidates per query when a prefilter is requested without a size
+DEFAULT_PREFILTER_SIZE = 200
+
+TOKEN_RE = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the their this to was were will with"
+    .split()
+)
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+def rankable_sections(sections):
+    """Indices of sections worth ranking: non-empty text, first copy of each (title, text) pair"""
+    seen = set()
+    keep = []
+    for i, section in enumerate(sections):
+        text = " ".join(section["text"].split()).lower()
+        if not text:
+            continue
+        key = (" ".join(section["title"].split()).lower(), text)
+        if key in seen:
+            continue
+        seen.add(key)
+        keep.append(i)
+    return keep
+
+class BM25Index:
+    """
+    Inverted index over tokenized documents with Okapi BM25 scoring. A query
+    only touches the postings of its own terms.
+    """
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.n_docs = len(documents)
+        self.lengths = np.array([len(tokens) for tokens in documents], dtype=np.float32)
+        self.avg_length = float(self.lengths.mean()) if self.n_docs else 0.0
+
+        counts = defaultdict(dict)
+        for doc, tokens in enumerate(documents):
+            for token in tokens:
+                counts[token][doc] = counts[token].get(doc, 0) + 1
+
+        self.postings = {}
+        for token, doc_counts in counts.items():
+            docs = np.fromiter(doc_counts.keys(), dtype=np.int64, count=len(doc_counts))
+            tfs = np.fromiter(doc_counts.values(), dtype=np.float32, count=len(doc_counts))
+            idf = math.log(1 + (self.n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            self.postings[token] = (docs, tfs, idf)
+
+    def scores(self, query_tokens):
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for token in set(query_tokens):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            docs, tfs, idf = posting
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[docs] / max(self.avg_length, 1e-9))
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+        return scores
+
+def prefilter(sections, queries, m=DEFAULT_PREFILTER_SIZE, dedup=False):
+    """
+    First-stage retrieval: for each query, indices into ``sections`` of the
+    top ``m`` BM25 matches over title and text. With ``dedup`` only
+    rankable_sections() are candidates, as in a deduplicated full ranking
+    """
+    keep = np.array(rankable_sections(sections) if dedup else range(len(sections)), dtype=np.int64)
+    index = BM25Index([tokenize(f"{sections[i]['title']} {sections[i]['text']}") for i in keep])
+    return [keep[top_k_indices(index.scores(tokenize(query)), m)] for query in queries]
+
+def recall_at_k(reference, candidate):
+    """Share of the reference top-k (any hashable section keys) that the candidate ranking also returns"""
+    if not reference:
+        return 1.0
+    return len(set(reference) & set(candidate)) / len(reference)
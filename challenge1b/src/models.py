@@ -0,0 +1,72 @@
+import threading
+import time
+
+# Heavy libraries (torch, transformers) are imported inside the loaders, so
+# importing this module, the parser or run.py --help stays cheap
+ENCODER = "encoder"
+ONNX_ENCODER = "onnx_encoder"
+SUMMARIZER = "summarizer"
+
+ENCODER_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SUMMARIZER_MODEL = "sshleifer/distilbart-cnn-12-6"
+
+def _load_encoder():
+    from transformers import AutoTokenizer, AutoModel
+    tokenizer = AutoTokenizer.from_pretrained(ENCODER_MODEL)
+    model = AutoModel.from_pretrained(ENCODER_MODEL)
+    model.eval()
+    return tokenizer, model
+
+def _load_onnx_encoder():
+    from src.onnx_encoder import load_onnx_encoder
+    return load_onnx_encoder()
+
+def _load_summarizer():
+    from transformers import pipeline
+    return pipeline("summarization", model=SUMMARIZER_MODEL)
+
+_loaders = {
+    ENCODER: _load_encoder,
+    ONNX_ENCODER: _load_onnx_encoder,
+    SUMMARIZER: _load_summarizer
+}
+# What warm_up() loads by default; the ONNX encoder needs a prior export
+DEFAULT_MODELS = (ENCODER, SUMMARIZER)
+_models = {}
+_load_seconds = {}
+_locks = {name: threading.Lock() for name in _loaders}
+
+def get(name):
+    """Return the model, loading it on first use; concurrent callers wait for a single load"""
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _locks[name]:
+        model = _models.get(name)
+        if model is None:
+            start = time.perf_counter()
+            model = _loaders[name]()
+            _load_seconds[name] = time.perf_counter() - start
+            _models[name] = model
+    return model
+
+def warm_up(*names, background=False):
+    """
+    Load models ahead of first use. With ``background`` they load in daemon
+    threads (returned) so the caller can parse PDFs meanwhile.
+    """
+    names = names or DEFAULT_MODELS
+    if not background:
+        for name in names:
+            get(name)
+        return []
+
+    threads = [threading.Thread(target=get, args=(name,), name=f"warm-up-{name}", daemon=True) for name in names]
+    for thread in threads:
+        thread.start()
+    return threads
+
+def load_times():
+    """Seconds spent loading each model so far"""
+    return dict(_load_seconds)
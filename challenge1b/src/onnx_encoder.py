@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from src import models
+
+ONNX_MODEL_DIR = os.environ.get("ONNX_MODEL_DIR", os.path.join(os.getcwd(), "models", "minilm-onnx"))
+FP32_NAME = "model.onnx"
+INT8_NAME = "model.int8.onnx"
+# BertModel.forward takes its inputs in this order
+FORWARD_INPUTS = ("input_ids", "attention_mask", "token_type_ids")
+
+# Intra-op threads parallelize each matmul; with batched inputs, extra
+# inter-op threads mostly add contention on small CPU nodes
+INTRA_OP_THREADS = int(os.environ.get("ONNX_INTRA_OP_THREADS", str(os.cpu_count() or 1)))
+INTER_OP_THREADS = int(os.environ.get("ONNX_INTER_OP_THREADS", "1"))
+
+def export_onnx(output_dir=ONNX_MODEL_DIR, opset=14, quantize=True):
+    """
+    Export the encoder to ONNX with dynamic batch/sequence axes and, by
+    default, a dynamically int8-quantized copy. Tokenizer and config are
+    saved alongside so the backend loads fully offline.
+    """
+    import torch
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    from transformers import AutoTokenizer, AutoModel
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(models.ENCODER_MODEL)
+    model = AutoModel.from_pretrained(models.ENCODER_MODEL)
+    model.eval()
+
+    sample = tokenizer(["Export sample sentence."], return_tensors='pt')
+    input_names = [name for name in FORWARD_INPUTS if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+
+    fp32_path = os.path.join(output_dir, FP32_NAME)
+    with torch.no_grad():
+        torch.onnx.export(model, tuple(sample[name] for name in input_names), fp32_path,
+                          input_names=input_names, output_names=["last_hidden_state"],
+                          dynamic_axes=dynamic_axes, opset_version=opset)
+
+    if quantize:
+        quantize_dynamic(fp32_path, os.path.join(output_dir, INT8_NAME), weight_type=QuantType.QInt8)
+
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+    return output_dir
+
+class OnnxEncoder:
+    """
+    ONNX Runtime session for the exported encoder; prefers the int8 graph.
+    Calling it with a padded numpy batch returns the last hidden state.
+    """
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, intra_op_threads=INTRA_OP_THREADS, inter_op_threads=INTER_OP_THREADS):
+        import onnxruntime as ort
+        from transformers import AutoConfig
+
+        path = os.path.join(model_dir, INT8_NAME)
+        if not os.path.exists(path):
+            path = os.path.join(model_dir, FP32_NAME)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No ONNX encoder in {model_dir}; run: python -m src.onnx_encoder export")
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.model_path = path
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.hidden_size = AutoConfig.from_pretrained(model_dir).hidden_size
+
+    def __call__(self, batch):
+        feeds = {name: np.asarray(batch[name], dtype=np.int64) for name in self.input_names}
+        return self.session.run(["last_hidden_state"], feeds)[0]
+
+def load_onnx_encoder(model_dir=ONNX_MODEL_DIR):
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(model_dir), OnnxEncoder(model_dir)
+
+def check_agreement(texts, query, top_k=5, tolerance=0.02):
+    """
+    Embed ``texts`` and ``query`` with both backends and compare. They agree
+    when every score is within ``tolerance`` of the PyTorch score and any
+    top-k swap is among sections whose PyTorch scores are within
+    ``tolerance`` of the k-th best.
+    """
+    from src.ranker import embed_texts, top_k_indices
+
+    reference = embed_texts(texts, backend="torch")
+    candidate = embed_texts(texts, backend="onnx")
+    reference_scores = reference @ embed_texts([query], backend="torch")[0]
+    candidate_scores = candidate @ embed_texts([query], backend="onnx")[0]
+
+    reference_top = top_k_indices(reference_scores, top_k)
+    candidate_top = top_k_indices(candidate_scores, top_k)
+    kth_score = reference_scores[reference_top[-1]] if len(reference_top) else 0.0
+    vector_cosines = np.sum(reference * candidate, axis=1)
+    max_score_diff = float(np.max(np.abs(reference_scores - candidate_scores))) if len(texts) else 0.0
+
+    report = {
+        "sections": len(texts),
+        "min_vector_cosine": float(vector_cosines.min()) if len(texts) else 1.0,
+        "max_score_diff": max_score_diff,
+        "top_k_overlap": len(set(reference_top) & set(candidate_top)) / max(1, len(reference_top)),
+        "same_top_k_order": reference_top.tolist() == candidate_top.tolist(),
+        "tolerance": tolerance
+    }
+    report["agrees"] = bool(
+        max_score_diff <= tolerance
+        and all(reference_scores[i] >= kth_score - tolerance for i in candidate_top)
+    )
+    return report
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export the section encoder to int8 ONNX and check it against PyTorch")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_cmd = commands.add_parser("export", help="Export and quantize the encoder")
+    export_cmd.add_argument("--output", default=ONNX_MODEL_DIR, help="Model directory (default: $ONNX_MODEL_DIR)")
+    export_cmd.add_argument("--no-quantize", action="store_true", help="Keep only the float32 graph")
+
+    check_cmd = commands.add_parser("check", help="Compare ONNX and PyTorch rankings on a PDF collection")
+    check_cmd.add_argument("--input", default=os.path.join(os.getcwd(), "input"), help="Directory of PDFs")
+    check_cmd.add_argument("--persona-task", default="persona_task.json")
+    check_cmd.add_argument("--top-k", type=int, default=5)
+    check_cmd.add_argument("--tolerance", type=float, default=0.02, help="Allowed cosine score difference")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.command == "export":
+        print(f"Exported encoder to {export_onnx(args.output, quantize=not args.no_quantize)}")
+        return
+
+    from src.parser import extract_text_sections
+
+    with open(args.persona_task, "r") as f:
+        task_info = json.load(f)
+    texts = []
+    for file in sorted(f for f in os.listdir(args.input) if f.endswith(".pdf")):
+        texts.extend(section["text"] for section in extract_text_sections(os.path.join(args.input, file)))
+
+    report = check_agreement(texts, f"{task_info['persona']}. {task_info['job_to_be_done']}",
+                             args.top_k, args.tolerance)
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["agrees"] else 1)
+
+if __name__ == "__main__":
+    main()
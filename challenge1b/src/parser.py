@@ -1,13 +1,52 @@
+from collections import namedtuple
+
 import fitz  # PyMuPDF
 
-def extract_text_sections(pdf_path):
+# A section body always covers at least this many lines after its heading
+CONTEXT_LINES = 5
+
+# Size thresholds frozen from a finished histogram; ``uniform`` means a
+# single font size, in which case every candidate line is H1
+HeadingThresholds = namedtuple("HeadingThresholds", ["max_size", "uniform"])
+
+def extract_text_sections(pdf_path, context_lines=CONTEXT_LINES):
     doc = fitz.open(pdf_path)
     sections = []
-    
+
     title = doc.metadata.get("title") or "Untitled Document"
+
+    # Pass 1: one get_text("dict") walk collects lines and the size histogram
+    lines, candidates, font_stats = read_lines(doc)
+
+    # Pass 2: classify against thresholds frozen from the whole document
+    thresholds = heading_thresholds(font_stats)
+    heading_positions = []
+    for position, page_num, font_size in candidates:
+        heading_level = classify_heading_level(font_size, thresholds)
+        if heading_level:
+            heading_positions.append(position)
+            sections.append({
+                "title": lines[position],
+                "page": page_num + 1,
+                "heading_level": heading_level
+            })
+
+    for n, section in enumerate(sections):
+        section["text"] = section_body(lines, heading_positions, n, context_lines)
+    return sections
+
+def read_lines(doc, page_numbers=None):
+    """
+    Walk the pages once. Returns every non-empty line in reading order,
+    heading candidates as (line position, page number, size of the last
+    span) and the histogram of rounded span sizes. Histograms of separate
+    page ranges can simply be added together.
+    """
+    lines = []
+    candidates = []
     font_stats = {}
 
-    for page_num in range(len(doc)):
+    for page_num in (range(len(doc)) if page_numbers is None else page_numbers):
         page = doc.load_page(page_num)
         blocks = page.get_text("dict")["blocks"]
 
@@ -22,27 +61,34 @@ def extract_text_sections(pdf_path):
                     font_stats[font_size] = font_stats.get(font_size, 0) + 1
 
                 line_text = line_text.strip()
-                if len(line_text.split()) < 2:
-                    continue  # likely not a real heading
-
-                heading_level = classify_heading_level(span["size"], font_stats)
-                if heading_level:
-                    sections.append({
-                        "title": line_text,
-                        "text": extract_context(doc, page_num, line_text),
-                        "page": page_num + 1,
-                        "heading_level": heading_level
-                    })
-    return sections
+                if not line_text:
+                    continue
+                lines.append(line_text)
+                if len(line_text.split()) >= 2:  # single words are likely not real headings
+                    candidates.append((len(lines) - 1, page_num, span["size"]))
+
+    return lines, candidates, font_stats
+
+def section_body(lines, heading_positions, n, context_lines=CONTEXT_LINES):
+    """Text from heading n up to the next heading (across pages), at least context_lines long"""
+    start = heading_positions[n] + 1
+    end = heading_positions[n + 1] if n + 1 < len(heading_positions) else len(lines)
+    end = max(end, min(start + context_lines, len(lines)))
+    return " ".join(lines[start:end])
 
-def classify_heading_level(font_size, font_stats):
-    # Dynamically define size thresholds
+def heading_thresholds(font_stats):
+    """Freeze thresholds from the size histogram; ties prefer the larger size so page order never matters"""
     if not font_stats:
         return None
-    sorted_sizes = sorted(font_stats.items(), key=lambda x: -x[1])
-    if len(sorted_sizes) < 2:
+    max_size = max(font_stats.items(), key=lambda x: (x[1], x[0]))[0]
+    return HeadingThresholds(max_size=max_size, uniform=len(font_stats) < 2)
+
+def classify_heading_level(font_size, thresholds):
+    if thresholds is None:
+        return None
+    if thresholds.uniform:
         return "H1"
-    max_size = sorted_sizes[0][0]
+    max_size = thresholds.max_size
     if font_size == max_size:
         return "H1"
     elif font_size >= max_size * 0.9:
@@ -51,16 +97,3 @@ def classify_heading_level(font_size, font_stats):
         return "H3"
     else:
         return None
-
-def extract_context(doc, page_num, heading_text, context_lines=5):
-    """Get some text below the heading to represent its content"""
-    page = doc.load_page(page_num)
-    full_text = page.get_text()
-    lines = full_text.split('\n')
-
-    for idx, line in enumerate(lines):
-        if heading_text.strip().lower() in line.strip().lower():
-            start = idx + 1
-            end = min(start + context_lines, len(lines))
-            return " ".join(lines[start:end]).strip()
-    return ""
@@ -0,0 +1,126 @@
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from src.parser import extract_text_sections
+from src.ranker import embed_texts, BATCH_SIZE
+
+PARSE_WORKERS = os.cpu_count() or 1
+# Parsed documents waiting for the embedding stage; parsing pauses when full
+QUEUE_SIZE = 8
+# Sections embedded per call; larger chunks bucket lengths better
+EMBED_CHUNK = 8 * BATCH_SIZE
+
+_DONE = object()
+
+def parse_document(input_dir, file):
+    sections = extract_text_sections(os.path.join(input_dir, file))
+    for section in sections:
+        section["document"] = file
+    return sections
+
+def _produce(input_dir, files, workers, sections_queue, errors):
+    """Parse PDFs (in a process pool when workers > 1) and stream them into the queue"""
+    try:
+        if workers <= 1:
+            for i, file in enumerate(files):
+                print(f"Processing {file}...")
+                sections_queue.put((i, parse_document(input_dir, file)))
+            return
+
+        # Fork server: the embedding thread may already hold torch state
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["src.parser"])
+        with ProcessPoolExecutor(max_workers=min(workers, len(files)), mp_context=context) as pool:
+            futures = {pool.submit(parse_document, input_dir, file): i for i, file in enumerate(files)}
+            for future in as_completed(futures):
+                i = futures[future]
+                print(f"Processing {files[i]}...")
+                sections_queue.put((i, future.result()))
+    except BaseException as e:
+        errors.append(e)
+    finally:
+        sections_queue.put(_DONE)
+
+def parse_and_embed(input_dir, files, workers=PARSE_WORKERS, cache=None, backend=None,
+                    batch_size=BATCH_SIZE, embed_chunk=EMBED_CHUNK, queue_size=QUEUE_SIZE):
+    """
+    Parse ``files`` and embed their sections as a two-stage pipeline: parser
+    processes feed a bounded queue while this thread embeds what has
+    arrived. Returns the sections in file order and their embeddings.
+    """
+    if not files:
+        return [], embed_texts([], backend=backend)
+
+    sections_queue = queue.Queue(maxsize=queue_size)
+    errors = []
+    producer = threading.Thread(target=_produce, args=(input_dir, files, workers, sections_queue, errors),
+                                name="parse-producer", daemon=True)
+    producer.start()
+
+    parsed = [None] * len(files)
+    vectors = [None] * len(files)
+    pending = []
+
+    def flush():
+        texts = [section["text"] for i in pending for section in parsed[i]]
+        embedded = embed_texts(texts, batch_size=batch_size, cache=cache, backend=backend)
+        offset = 0
+        for i in pending:
+            vectors[i] = embedded[offset:offset + len(parsed[i])]
+            offset += len(parsed[i])
+        pending.clear()
+
+    try:
+        while True:
+            item = sections_queue.get()
+            if item is _DONE:
+                break
+            i, sections = item
+            parsed[i] = sections
+            pending.append(i)
+            if sum(len(parsed[j]) for j in pending) >= embed_chunk:
+                flush()
+    except BaseException:
+        # Let the producer run to completion so its process pool shuts down
+        while sections_queue.get() is not _DONE:
+            pass
+        raise
+    producer.join()
+    if errors:
+        raise errors[0]
+    if pending:
+        flush()
+
+    all_sections = [section for sections in parsed for section in sections]
+    # Files without sections may hold (0, 0) placeholders
+    parts = [part for part in vectors if len(part)]
+    return all_sections, np.concatenate(parts) if parts else embed_texts([], backend=backend)
+
+def parse_documents(input_dir, files, workers=PARSE_WORKERS, queue_size=QUEUE_SIZE):
+    """Parse ``files`` with the same worker pool, without embedding; sections in file order"""
+    if not files:
+        return []
+
+    sections_queue = queue.Queue(maxsize=queue_size)
+    errors = []
+    producer = threading.Thread(target=_produce, args=(input_dir, files, workers, sections_queue, errors),
+                                name="parse-producer", daemon=True)
+    producer.start()
+
+    parsed = [None] * len(files)
+    while True:
+        item = sections_queue.get()
+        if item is _DONE:
+            break
+        i, sections = item
+        parsed[i] = sections
+    producer.join()
+    if errors:
+        raise errors[0]
+
+    return [section for sections in parsed for section in sections]
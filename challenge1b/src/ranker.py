@@ -1,29 +1,156 @@
-from sklearn.metrics.pairwise import cosine_similarity
-from transformers import AutoTokenizer, AutoModel
-import torch
+import os
 
-# Load a small model to stay within 1GB
-MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+import numpy as np
 
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-model = AutoModel.from_pretrained(MODEL_NAME)
+from src import models
+
+# A small model to stay within 1GB, loaded on first use
+MODEL_NAME = models.ENCODER_MODEL
+MAX_LENGTH = 512
+BATCH_SIZE = 32
+
+# "torch" runs the model eagerly, "onnx" the int8-quantized export (see src/onnx_encoder.py)
+BACKENDS = ("torch", "onnx")
+ENCODER_BACKEND = os.environ.get("ENCODER_BACKEND", "torch")
+
+def mean_pool(last_hidden_state, attention_mask):
+    """Average token vectors, ignoring padding positions"""
+    mask = attention_mask.unsqueeze(-1).to(last_hidden_state.dtype)
+    summed = (last_hidden_state * mask).sum(dim=1)
+    counts = mask.sum(dim=1).clamp(min=1e-9)
+    return summed / counts
+
+def _batch_encoder(backend):
+    """
+    Return (tokenizer, tensor type, dimension, encode) for a backend, where
+    encode maps a padded batch to L2-normalized float32 rows
+    """
+    if backend == "onnx":
+        tokenizer, encoder = models.get(models.ONNX_ENCODER)
+
+        def encode(batch):
+            hidden = encoder(batch)
+            mask = batch["attention_mask"][..., None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+        return tokenizer, 'np', encoder.hidden_size, encode
+
+    if backend != "torch":
+        raise ValueError(f"Unknown encoder backend {backend!r}, expected one of {BACKENDS}")
+
+    import torch
+
+    tokenizer, model = models.get(models.ENCODER)
+
+    def encode(batch):
+        with torch.no_grad():
+            output = model(**batch)
+        pooled = mean_pool(output.last_hidden_state, batch["attention_mask"])
+        return torch.nn.functional.normalize(pooled, p=2, dim=1).numpy()
+
+    return tokenizer, 'pt', model.config.hidden_size, encode
+
+def embed_texts(texts, batch_size=BATCH_SIZE, max_length=MAX_LENGTH, cache=None, backend=None):
+    """
+    Embed texts as L2-normalized float32 rows, in input order.
+
+    Texts are tokenized once, sorted by token length and padded per batch,
+    so short sections are not padded up to the longest one in the corpus.
+    With an EmbeddingCache only the texts it does not hold yet are encoded.
+    No texts give a (0, 0) array without loading the encoder.
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    backend = backend or ENCODER_BACKEND
+    if cache is not None:
+        # Quantized vectors differ slightly, so each backend has its own entries
+        cache_model = f"{MODEL_NAME}@{max_length}" + (":onnx-int8" if backend == "onnx" else "")
+        cached = cache.get_many(cache_model, texts)
+        missing = [i for i in range(len(texts)) if i not in cached]
+        if not missing:
+            # Full hit: the encoder is not even loaded
+            return np.stack([cached[i] for i in range(len(texts))])
+
+        fresh = embed_texts([texts[i] for i in missing], batch_size, max_length, backend=backend)
+        cache.put_many(cache_model, [texts[i] for i in missing], fresh)
+        embeddings = np.zeros((len(texts), fresh.shape[1]), dtype=np.float32)
+        for i, vector in cached.items():
+            embeddings[i] = vector
+        embeddings[missing] = fresh
+        return embeddings
+
+    tokenizer, tensor_type, dim, encode = _batch_encoder(backend)
+    embeddings = np.zeros((len(texts), dim), dtype=np.float32)
+
+    encoded = tokenizer(list(texts), truncation=True, max_length=max_length)
+    features = [{key: encoded[key][i] for key in encoded.keys()} for i in range(len(texts))]
+    order = sorted(range(len(texts)), key=lambda i: len(features[i]["input_ids"]))
+
+    for start in range(0, len(order), batch_size):
+        batch_ids = order[start:start + batch_size]
+        batch = tokenizer.pad([features[i] for i in batch_ids], return_tensors=tensor_type)
+        embeddings[batch_ids] = encode(batch)
 
-def get_embedding(text):
-    inputs = tokenizer(text, return_tensors='pt', truncation=True, max_length=512)
-    with torch.no_grad():
-        output = model(**inputs)
-    embeddings = output.last_hidden_state.mean(dim=1)
     return embeddings
 
-def rank_sections(sections, persona, job_to_be_done, top_k=5):
+def get_embedding(text, backend=None):
+    return embed_texts([text], backend=backend)[0]
+
+def top_k_indices(scores, k):
+    """Indices of the k highest scores, best first"""
+    if k <= 0:
+        return np.arange(0)
+    if k >= len(scores):
+        candidates = np.arange(len(scores))
+    else:
+        candidates = np.sort(np.argpartition(-scores, k - 1)[:k])
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+def rank_sections(sections, persona, job_to_be_done, top_k=5, batch_size=BATCH_SIZE, cache=None, backend=None,
+                  prefilter=None):
+    """
+    Rank sections against the persona and job. With ``prefilter`` only the
+    top-M BM25 candidates (see src/lexical.py) are embedded and re-ranked.
+    """
+    if not sections:
+        return []
+
     query = f"{persona}. {job_to_be_done}"
-    query_vec = get_embedding(query)
+    if prefilter:
+        from src.lexical import prefilter as lexical_prefilter
+        sections = [sections[i] for i in lexical_prefilter(sections, [query], prefilter)[0]]
+
+    query_vec = get_embedding(query, backend=backend)
+    section_vecs = embed_texts([section["text"] for section in sections], batch_size=batch_size,
+                               cache=cache, backend=backend)
+    return select_top_sections(sections, section_vecs, query_vec, top_k)
+
+def select_top_sections(sections, section_vecs, query_vec, top_k=5):
+    """Score already embedded sections against the query and return the top k, best first"""
+    # Rows are normalized, so the dot product is the cosine similarity
+    scores = section_vecs @ query_vec
+    for section, score in zip(sections, scores):
+        section["score"] = float(score)
 
-    for section in sections:
-        section_vec = get_embedding(section["text"])
-        similarity = cosine_similarity(query_vec, section_vec)[0][0]
-        section["score"] = similarity
+    return [sections[i] for i in top_k_indices(scores, top_k)]
 
-    # Sort by similarity
-    ranked = sorted(sections, key=lambda x: x["score"], reverse=True)
-    return ranked[:top_k]
+def top_k_per_query(section_vecs, query_vecs, top_k=5, candidates=None):
+    """
+    Score every section against every query with one matrix product; top-k
+    indices and scores per query. ``candidates`` optionally restricts each
+    query to its own rows.
+    """
+    if not len(section_vecs):
+        return [(np.arange(0), np.zeros(0, dtype=np.float32)) for _ in range(len(query_vecs))]
+    scores = section_vecs @ query_vecs.T
+    results = []
+    for q in range(scores.shape[1]):
+        query_scores = scores[:, q]
+        if candidates is not None:
+            query_scores = np.full(len(scores), -np.inf, dtype=scores.dtype)
+            query_scores[candidates[q]] = scores[candidates[q], q]
+        top = top_k_indices(query_scores, top_k)
+        results.append((top[np.isfinite(query_scores[top])], query_scores))
+    return results
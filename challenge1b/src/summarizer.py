@@ -1,17 +1,51 @@
-from transformers import pipeline
+from src import models
 
-# Use a small model for offline summarization
-summarizer = pipeline("summarization", model="sshleifer/distilbart-cnn-12-6")
+BATCH_SIZE = 4
+# Texts with fewer tokens than this are returned as they are
+MIN_INPUT_TOKENS = 40
+
+def summarize_batch(texts, max_tokens=100, batch_size=BATCH_SIZE, min_input_tokens=MIN_INPUT_TOKENS):
+    """
+    Summarize several texts at once, returning one {"refined_text": ...} per text.
+
+    Inputs are truncated to the model's real token limit, sorted by token
+    length and generated in batches, so padding stays small. Texts too short
+    to be worth summarizing are passed through unchanged.
+    """
+    results = [{"refined_text": ""} for _ in texts]
+    pending = [i for i, text in enumerate(texts) if text.strip()]
+    if not pending:
+        return results
+
+    import torch
+
+    # A small model for offline summarization, loaded on first use
+    summarizer = models.get(models.SUMMARIZER)
+    tokenizer, model = summarizer.tokenizer, summarizer.model
+    max_input_len = min(tokenizer.model_max_length, model.config.max_position_embeddings)
+
+    encoded = tokenizer([texts[i] for i in pending], truncation=True, max_length=max_input_len)
+    features = {i: {key: encoded[key][n] for key in encoded.keys()} for n, i in enumerate(pending)}
+
+    to_generate = []
+    for i in pending:
+        if len(features[i]["input_ids"]) < min_input_tokens:
+            results[i]["refined_text"] = texts[i].strip()
+        else:
+            to_generate.append(i)
+    to_generate.sort(key=lambda i: len(features[i]["input_ids"]))
+
+    for start in range(0, len(to_generate), batch_size):
+        batch_ids = to_generate[start:start + batch_size]
+        batch = tokenizer.pad([features[i] for i in batch_ids], return_tensors='pt')
+        with torch.no_grad():
+            output_ids = model.generate(**batch, max_length=max_tokens, min_length=20, do_sample=False)
+        # Decode like pipeline("summarization") does, so batching does not change the text
+        summaries = tokenizer.batch_decode(output_ids, skip_special_tokens=True, clean_up_tokenization_spaces=False)
+        for i, summary in zip(batch_ids, summaries):
+            results[i]["refined_text"] = summary
+
+    return results
 
 def summarize(text, max_tokens=100):
-    if not text.strip():
-        return {"refined_text": ""}
-    
-    # Limit to max tokens allowed by the model
-    max_input_len = 1024
-    input_text = text if len(text.split()) < max_input_len else " ".join(text.split()[:max_input_len])
-
-    summary = summarizer(input_text, max_length=max_tokens, min_length=20, do_sample=False)
-    return {
-        "refined_text": summary[0]["summary_text"]
-    }
+    return summarize_batch([text], max_tokens=max_tokens)[0]
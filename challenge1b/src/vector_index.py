@@ -0,0 +1,350 @@
+import os
+import re
+import sqlite3
+
+import numpy as np
+
+BLOCK_ROWS = 65536
+
+class VectorIndex:
+    """
+    Persistent section index: embeddings in a flat float32 file that is
+    memory-mapped for search, metadata and tombstones in SQLite.
+
+    Rows are only ever appended; removing a document marks its rows deleted
+    until ``compact()`` rewrites the file. Vectors are written and synced
+    before their metadata is committed, so after a crash any trailing rows
+    without metadata are simply truncated on the next open. Compaction
+    writes a new generation of the vector file, and the database switches
+    to it in the same transaction that renumbers the rows. One writer at a
+    time is assumed.
+
+    Search is exact by default (blocked matrix-vector products over the
+    memory map). After ``train_ivf()`` an approximate mode scores only the
+    ``n_probe`` inverted lists whose centroids are closest to the query.
+    """
+
+    VECTORS_NAME = "vectors.f32"
+    DB_NAME = "sections.sqlite"
+    CENTROIDS_NAME = "ivf_centroids.npy"
+    LISTS_NAME = "ivf_lists.npy"
+
+    def __init__(self, directory, dim=None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(os.path.join(directory, self.DB_NAME))
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS documents (name TEXT PRIMARY KEY, signature TEXT);"
+            "CREATE TABLE IF NOT EXISTS sections ("
+            " row INTEGER PRIMARY KEY,"
+            " document TEXT NOT NULL,"
+            " page INTEGER,"
+            " title TEXT,"
+            " heading_level TEXT,"
+            " text TEXT,"
+            " deleted INTEGER NOT NULL DEFAULT 0);"
+            "CREATE INDEX IF NOT EXISTS sections_document ON sections (document);"
+        )
+        self.conn.commit()
+
+        stored = self.conn.execute("SELECT value FROM info WHERE key = 'dim'").fetchone()
+        if stored is not None and dim is not None and int(stored[0]) != dim:
+            raise ValueError(f"Index at {directory} holds {stored[0]}-d vectors, not {dim}-d")
+        self.dim = int(stored[0]) if stored is not None else dim
+
+        # Files of the committed generation; others are leftovers of an interrupted compaction
+        stored = self.conn.execute("SELECT value FROM info WHERE key = 'generation'").fetchone()
+        self.generation = int(stored[0]) if stored is not None else 0
+        self.vectors_path = self._generation_path(self.VECTORS_NAME, self.generation)
+        self.lists_path = self._generation_path(self.LISTS_NAME, self.generation)
+        self._remove_stale_generations()
+
+        self.n_rows = self.conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM sections").fetchone()[0]
+        self._truncate_orphans()
+
+        self._deleted = np.zeros(self.n_rows, dtype=bool)
+        deleted_rows = [row for (row,) in self.conn.execute("SELECT row FROM sections WHERE deleted = 1")]
+        self._deleted[deleted_rows] = True
+
+        self._vectors = None
+        self._centroids = None
+        self._lists = None
+        self._list_rows = None
+        self._load_ivf()
+
+    def _generation_path(self, name, generation):
+        if not generation:
+            return os.path.join(self.directory, name)
+        stem, ext = os.path.splitext(name)
+        return os.path.join(self.directory, f"{stem}.{generation}{ext}")
+
+    def _remove_stale_generations(self):
+        current = {os.path.basename(self.vectors_path), os.path.basename(self.lists_path)}
+        patterns = [re.compile(re.escape(stem) + r"(\.\d+)?" + re.escape(ext) + "$")
+                    for stem, ext in map(os.path.splitext, (self.VECTORS_NAME, self.LISTS_NAME))]
+        for name in os.listdir(self.directory):
+            stale = name not in current and any(pattern.match(name) for pattern in patterns)
+            if stale or name.endswith(".npy.tmp"):  # Or an interrupted _save_array
+                os.remove(os.path.join(self.directory, name))
+
+    def _truncate_orphans(self):
+        if self.dim is None or not os.path.exists(self.vectors_path):
+            return
+        expected = self.n_rows * self.dim * 4
+        if os.path.getsize(self.vectors_path) > expected:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(expected)
+
+    @property
+    def vectors(self):
+        if self._vectors is None:
+            if self.n_rows == 0:
+                return np.zeros((0, self.dim or 0), dtype=np.float32)
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self.n_rows, self.dim))
+        return self._vectors
+
+    def __len__(self):
+        return int(self.n_rows - self._deleted.sum())
+
+    def documents(self):
+        return {name: signature for name, signature in self.conn.execute("SELECT name, signature FROM documents")}
+
+    def add_document(self, name, sections, vectors, signature=None):
+        """Index ``sections`` (parser dicts) of one document, replacing any previous version"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if len(vectors) != len(sections):
+            raise ValueError(f"{len(sections)} sections but {len(vectors)} vectors")
+        if self.dim is None and len(vectors):
+            self.dim = vectors.shape[1]
+            self.conn.execute("INSERT INTO info (key, value) VALUES ('dim', ?)", (str(self.dim),))
+            self.conn.commit()
+        if len(vectors) and vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-d vectors, got {vectors.shape[1]}-d")
+
+        self.remove_document(name)
+
+        with open(self.vectors_path, "ab") as f:
+            f.write(vectors.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        start = self.n_rows
+        self.conn.executemany(
+            "INSERT INTO sections (row, document, page, title, heading_level, text) VALUES (?, ?, ?, ?, ?, ?)",
+            [(start + i, name, section.get("page"), section.get("title"), section.get("heading_level"), section.get("text"))
+             for i, section in enumerate(sections)]
+        )
+        self.conn.execute("INSERT OR REPLACE INTO documents (name, signature) VALUES (?, ?)", (name, signature))
+        self.conn.commit()
+
+        self.n_rows += len(vectors)
+        self._deleted = np.concatenate([self._deleted, np.zeros(len(vectors), dtype=bool)])
+        self._vectors = None
+        if self._centroids is not None:
+            self._lists = np.concatenate([self._lists, self._assign(vectors)])
+            self._list_rows = None
+            _save_array(self.lists_path, self._lists)
+
+    def remove_document(self, name):
+        rows = [row for (row,) in self.conn.execute(
+            "SELECT row FROM sections WHERE document = ? AND deleted = 0", (name,))]
+        self.conn.execute("UPDATE sections SET deleted = 1 WHERE document = ?", (name,))
+        self.conn.execute("DELETE FROM documents WHERE name = ?", (name,))
+        self.conn.commit()
+        self._deleted[rows] = True
+        return len(rows)
+
+    def compact(self):
+        """
+        Rewrite the vector file without deleted rows and renumber the
+        metadata. The rewritten rows go to the next generation's files, which
+        the database adopts in the same commit as the new row numbers; a crash
+        at any point leaves the old or the new generation, never a mix. Run
+        it while nothing else uses the index.
+        """
+        live = np.flatnonzero(~self._deleted)
+        if len(live) == self.n_rows:
+            return
+
+        generation = self.generation + 1
+        vectors_path = self._generation_path(self.VECTORS_NAME, generation)
+        lists_path = self._generation_path(self.LISTS_NAME, generation)
+        lists = self._lists[live] if self._centroids is not None else None
+        try:
+            with open(vectors_path, "wb") as f:
+                for start in range(0, len(live), BLOCK_ROWS):
+                    f.write(np.ascontiguousarray(self.vectors[live[start:start + BLOCK_ROWS]]).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            if lists is not None:
+                _write_array(lists_path, lists)
+            _fsync_directory(self.directory)
+
+            self.conn.execute("DELETE FROM sections WHERE deleted = 1")
+            # New row numbers never exceed old ones, so ascending updates cannot collide
+            self.conn.executemany("UPDATE sections SET row = ? WHERE row = ?",
+                                  [(new, int(old)) for new, old in enumerate(live) if new != old])
+            self.conn.execute("INSERT OR REPLACE INTO info (key, value) VALUES ('generation', ?)", (str(generation),))
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            for path in (vectors_path, lists_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+
+        old_paths = (self.vectors_path, self.lists_path)
+        self.generation = generation
+        self.vectors_path, self.lists_path = vectors_path, lists_path
+        self._vectors = None
+        for path in old_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+        self.n_rows = len(live)
+        self._deleted = np.zeros(self.n_rows, dtype=bool)
+        if lists is not None:
+            self._lists = lists
+            self._list_rows = None
+
+    def train_ivf(self, n_lists=None, iterations=10, sample_size=50_000, seed=0):
+        """Cluster the live vectors (spherical k-means) into inverted lists for approximate search"""
+        live = np.flatnonzero(~self._deleted)
+        if not len(live):
+            return
+        n_lists = n_lists or max(1, int(np.sqrt(len(live))))
+        n_lists = min(n_lists, len(live))
+
+        rng = np.random.default_rng(seed)
+        sample = self.vectors[np.sort(rng.choice(live, min(sample_size, len(live)), replace=False))]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+        self._centroids = centroids.astype(np.float32)
+        self._lists = np.concatenate([self._assign(self.vectors[start:start + BLOCK_ROWS])
+                                      for start in range(0, self.n_rows, BLOCK_ROWS)])
+        self._list_rows = None
+        _save_array(os.path.join(self.directory, self.CENTROIDS_NAME), self._centroids)
+        _save_array(self.lists_path, self._lists)
+
+    def _load_ivf(self):
+        centroids_path = os.path.join(self.directory, self.CENTROIDS_NAME)
+        if not (os.path.exists(centroids_path) and os.path.exists(self.lists_path)):
+            return
+        self._centroids = np.load(centroids_path)
+        lists = np.load(self.lists_path)[:self.n_rows]
+        if len(lists) < self.n_rows:
+            lists = np.concatenate([lists, self._assign(self.vectors[len(lists):])])
+        self._lists = lists
+
+    def _assign(self, vectors):
+        if not len(vectors):
+            return np.zeros(0, dtype=np.int32)
+        return np.argmax(np.asarray(vectors) @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _rows_in_lists(self, lists):
+        if self._list_rows is None:
+            order = np.argsort(self._lists, kind="stable")
+            bounds = np.searchsorted(self._lists[order], np.arange(len(self._centroids) + 1))
+            self._list_rows = (order, bounds)
+        order, bounds = self._list_rows
+        return np.sort(np.concatenate([order[bounds[c]:bounds[c + 1]] for c in lists]))
+
+    def search(self, query, k=5, n_probe=None, block_rows=BLOCK_ROWS):
+        """
+        Top-k sections by dot product with ``query`` (cosine for normalized
+        vectors), best first. ``n_probe`` switches to approximate IVF search.
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        if k <= 0 or not len(self):
+            return []
+
+        if n_probe is not None and self._centroids is not None:
+            probe = _top_k(self._centroids @ query, max(1, n_probe))
+            candidates = self._rows_in_lists(probe)
+            candidates = candidates[~self._deleted[candidates]]
+            scores = self.vectors[candidates] @ query
+            best = _top_k(scores, k)
+            rows, scores = candidates[best], scores[best]
+        else:
+            rows = np.zeros(0, dtype=np.int64)
+            scores = np.zeros(0, dtype=np.float32)
+            for start in range(0, self.n_rows, block_rows):
+                block_scores = self.vectors[start:start + block_rows] @ query
+                block_scores[self._deleted[start:start + block_rows]] = -np.inf
+                best = _top_k(block_scores, k)
+                rows = np.concatenate([rows, best + start])
+                scores = np.concatenate([scores, block_scores[best]])
+                keep = _top_k(scores, k)
+                rows, scores = rows[keep], scores[keep]
+            live = np.isfinite(scores)
+            rows, scores = rows[live], scores[live]
+
+        return self._fetch(rows, scores)
+
+    def _fetch(self, rows, scores):
+        placeholders = ",".join("?" * len(rows))
+        records = {row: rest for row, *rest in self.conn.execute(
+            f"SELECT row, document, page, title, heading_level, text FROM sections WHERE row IN ({placeholders})",
+            [int(row) for row in rows])}
+        results = []
+        for row, score in zip(rows, scores):
+            document, page, title, heading_level, text = records[int(row)]
+            results.append({
+                "document": document,
+                "page": page,
+                "title": title,
+                "heading_level": heading_level,
+                "text": text,
+                "score": float(score)
+            })
+        return results
+
+    def close(self):
+        self._vectors = None
+        self.conn.close()
+
+def _write_array(path, array):
+    with open(path, "wb") as f:
+        np.save(f, array)
+        f.flush()
+        os.fsync(f.fileno())
+
+def _save_array(path, array):
+    """Replace an .npy file atomically, so a crash leaves the old or the new array, never a truncated one"""
+    tmp_path = path + ".tmp"
+    try:
+        _write_array(tmp_path, array)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(os.path.dirname(path))
+
+def _fsync_directory(directory):
+    """Make new directory entries durable (a no-op where directories cannot be opened)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _top_k(scores, k):
+    """Indices of the k highest scores, best first (row order breaks ties)"""
+    if k >= len(scores):
+        candidates = np.arange(len(scores))
+    else:
+        candidates = np.sort(np.argpartition(-scores, k - 1)[:k])
+    return candidates[np.argsort(-scores[candidates], kind="stable")]